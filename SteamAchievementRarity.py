@@ -0,0 +1,127 @@
+from array import array
+from multiprocessing.pool import ThreadPool
+import SteamWebClasses as swc
+from SteamDatabase import parse_percent
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Global unlock percentages are kept as one float32 column per app, next to the achievement names in page order,
+# instead of a dict with a '12.3%' string per achievement.
+
+
+class AchievementRarity:
+    def __init__(self, client=None):
+        self.client = swc.get_client(client)
+        self.names = {}
+        self.percents = {}
+
+    def __len__(self):
+        return sum(len(p) for p in self.percents.values())
+
+    def add(self, app_id, achievements):
+        if not achievements:
+            return
+        app_id = str(app_id)
+        self.names[app_id] = [a['Primary Text'] for a in achievements]
+        self.percents[app_id] = array('f', (parse_percent(a['Percent']) or 0.0 for a in achievements))
+
+    def collect(self, app_ids, workers=8, pipeline=None):
+        # Either fetches on a thread pool, or hands the pages to a SteamWebPipeline.ParsePipeline to parse.
+        if pipeline is not None:
+            results = pipeline.get_global_achievements(app_ids).items()
+        else:
+            def fetch(app_id):
+                achievements = swc.SteamAppGlobalAchievements(app_id=app_id, client=self.client)
+                try:
+                    achievements.initialize()
+                except swc.APP_FETCH_ERRORS:
+                    pass
+                return str(app_id), achievements.achievements
+
+            pool = ThreadPool(workers)
+            try:
+                results = pool.map(fetch, app_ids)
+            finally:
+                pool.terminate()
+                pool.join()
+        for app_id, achievements in results:
+            self.add(app_id, achievements)
+        return len(self.percents)
+
+    def collect_from_catalog(self, catalog, app_ids):
+        for app_id in app_ids:
+            self.add(app_id, catalog.get_global_achievements(app_id))
+        return len(self.percents)
+
+    def get_user_achievements(self, user_id, app_ids=None, workers=8):
+        # Defaults to every app that has been collected.
+
+        def fetch(app_id):
+            achievements = swc.SteamAppUserAchievements(user_id, app_id=app_id, client=self.client)
+            try:
+                achievements.initialize()
+            except swc.APP_FETCH_ERRORS:
+                pass
+            return achievements
+
+        pool = ThreadPool(workers)
+        try:
+            return pool.map(fetch, self.names.keys() if app_ids is None else app_ids)
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def get_percents(self, app_id):
+        column = self.percents[str(app_id)]
+        if numpy is None:
+            return column
+        return numpy.frombuffer(column.tostring(), dtype=numpy.float32)
+
+    def get_lowest(self, selection, count):
+        # selection is [(app_id, [positions])]; returns [(app_id, name, percent)] for the lowest percents, in order.
+        selection = [(app_id, positions) for app_id, positions in selection if len(positions)]
+        if not selection:
+            return []
+        if numpy is not None:
+            percents = numpy.concatenate([self.get_percents(a)[numpy.asarray(p, dtype=numpy.intp)]
+                                          for a, p in selection])
+            apps = numpy.concatenate([numpy.repeat(i, len(p)) for i, (_, p) in enumerate(selection)])
+            positions = numpy.concatenate([numpy.asarray(p, dtype=numpy.intp) for _, p in selection])
+            order = numpy.argsort(percents, kind='mergesort')[:count]
+            rows = zip(apps[order].tolist(), positions[order].tolist(), percents[order].tolist())
+        else:
+            rows = sorted(((i, p, self.percents[a][p]) for i, (a, positions) in enumerate(selection)
+                           for p in positions), key=lambda r: r[2])[:count]
+        return [(selection[i][0], self.names[selection[i][0]][p], round(percent, 2)) for i, p, percent in rows]
+
+    def get_rarest(self, count=10, app_ids=None):
+        # Returns [(app_id, name, percent)], rarest first.
+        app_ids = self.percents.keys() if app_ids is None else [str(a) for a in app_ids if str(a) in self.percents]
+        return self.get_lowest([(a, range(len(self.percents[a]))) for a in app_ids], count)
+
+    def get_rarest_unlocked(self, user_achievements, count=10):
+        # Joins initialized SteamAppUserAchievements objects with the collected percentages by achievement name.
+        selection = []
+        for ua in user_achievements:
+            app_id = str(ua.app_id)
+            if app_id not in self.names:
+                continue
+            positions = dict((name, i) for i, name in reversed(list(enumerate(self.names[app_id]))))
+            names = [a['Primary Text'] for a in ua.unlocked_achievements]
+            selection.append((app_id, sorted(set(positions[name] for name in names if name in positions))))
+        return self.get_lowest(selection, count)
+
+    def get_app_summary(self, app_id):
+        percents = self.get_percents(app_id)
+        if not len(percents):
+            return None
+        if numpy is not None:
+            return {'count': len(percents), 'mean': float(percents.mean()), 'min': float(percents.min()),
+                    'median': float(numpy.median(percents))}
+        ordered = sorted(percents)
+        middle = len(ordered) // 2
+        median = ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2.0
+        return {'count': len(percents), 'mean': sum(percents) / len(percents), 'min': ordered[0], 'median': median}
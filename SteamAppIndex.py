@@ -0,0 +1,129 @@
+import atexit
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from multiprocessing.pool import ThreadPool
+
+APP_LIST_URL = 'https://api.steampowered.com/ISteamApps/GetAppList/v2/'
+
+# Seconds before a resolved name is looked up again, and before the app list is downloaded again.
+DEFAULT_TTL = 7 * 24 * 60 * 60
+
+TRADEMARK_RE = re.compile(u'[\u2122\u00ae\u00a9]')
+NON_WORD_RE = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def normalize_title(title):
+    # 'Half-Life 2', 'half life 2' and u'Half-Life\u2122 2' all map to 'half life 2'.
+    if isinstance(title, str):
+        title = title.decode('utf-8', 'replace')
+    title = unicodedata.normalize('NFKD', TRADEMARK_RE.sub(u'', title))
+    title = u''.join(c for c in title if not unicodedata.combining(c))
+    return NON_WORD_RE.sub(u' ', title.lower()).strip()
+
+
+class AppIndex:
+    def __init__(self, path, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        self.names = {}
+        self.seeded = None
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.load()
+        atexit.register(self.save)
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self.names = data['names']
+            self.seeded = data.get('seeded')
+        except (IOError, ValueError, KeyError):
+            self.names = {}
+            self.seeded = None
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'names': self.names, 'seeded': self.seeded}, f)
+            os.rename(tmp_path, self.path)
+            self.dirty = False
+
+    def is_fresh(self, stored):
+        return time.time() - stored < self.ttl
+
+    def get(self, name):
+        key = normalize_title(name)
+        with self.lock:
+            entry = self.names.get(key)
+            if entry and self.is_fresh(entry[1]):
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def put(self, name, app_id):
+        key = normalize_title(name)
+        if not key:
+            return
+        with self.lock:
+            self.names[key] = [str(app_id), time.time()]
+            self.dirty = True
+
+    def needs_seed(self):
+        return self.seeded is None or not self.is_fresh(self.seeded)
+
+    def seed(self, client, url=APP_LIST_URL):
+        # The app list has every app, DLC and soundtrack on the store.  Where several share a name the lowest app id
+        # wins, which is almost always the base game.  Names that are still fresh, e.g. from a search, are left alone.
+        r = client.get(url, 'app_list')
+        apps = r.json()['applist']['apps']
+        now = time.time()
+        seeded = {}
+        for app in apps:
+            key = normalize_title(app['name'])
+            if key and (key not in seeded or app['appid'] < seeded[key]):
+                seeded[key] = app['appid']
+        with self.lock:
+            for key, app_id in seeded.items():
+                entry = self.names.get(key)
+                if not entry or not self.is_fresh(entry[1]):
+                    self.names[key] = [str(app_id), now]
+            self.seeded = now
+            self.dirty = True
+            self.save()
+        return len(seeded)
+
+    def resolve_many(self, names, resolve, workers=8):
+        # Returns {name: app_id}; only names the index can't answer are passed to resolve(), concurrently.
+        resolved = {}
+        misses = []
+        for name in set(names):
+            app_id = self.get(name)
+            if app_id is None:
+                misses.append(name)
+            else:
+                resolved[name] = app_id
+        if misses:
+            pool = ThreadPool(workers)
+            try:
+                for name, app_id in zip(misses, pool.map(resolve, misses)):
+                    resolved[name] = app_id
+                    if app_id is not None:
+                        self.put(name, app_id)
+            finally:
+                pool.terminate()
+                pool.join()
+        return resolved
+
+    def get_stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.names), 'seeded': self.seeded}
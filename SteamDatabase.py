@@ -0,0 +1,242 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+import SteamWebClasses as swc
+from SteamRecords import make_record, Achievement
+
+# Seconds before a stored field is considered stale and worth scraping again.
+DEFAULT_FRESHNESS = {'app_info': 7 * 24 * 60 * 60,
+                     'historical_low': 24 * 60 * 60,
+                     'achievements': 24 * 60 * 60}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS apps (
+    app_id TEXT PRIMARY KEY,
+    app_name TEXT,
+    release_date TEXT,
+    metascore INTEGER,
+    review_summary TEXT,
+    categories TEXT,
+    user_tags TEXT,
+    genres TEXT,
+    developer TEXT,
+    publisher TEXT,
+    game_desc TEXT
+);
+CREATE TABLE IF NOT EXISTS historical_lows (
+    app_id TEXT PRIMARY KEY,
+    price TEXT,
+    price_cents INTEGER,
+    discount TEXT,
+    date TEXT
+);
+CREATE TABLE IF NOT EXISTS wishlist_games (
+    user_id TEXT,
+    app_id TEXT,
+    title TEXT,
+    added_on INTEGER,
+    url TEXT,
+    discounted INTEGER,
+    full_price TEXT,
+    discount_price TEXT,
+    discount_price_cents INTEGER,
+    discount_percent TEXT,
+    PRIMARY KEY (user_id, app_id)
+);
+CREATE INDEX IF NOT EXISTS wishlist_games_app_id ON wishlist_games (app_id);
+CREATE TABLE IF NOT EXISTS global_achievements (
+    app_id TEXT,
+    position INTEGER,
+    primary_text TEXT,
+    secondary_text TEXT,
+    percent REAL,
+    PRIMARY KEY (app_id, position)
+);
+CREATE TABLE IF NOT EXISTS refreshed (
+    key TEXT,
+    field TEXT,
+    updated REAL,
+    PRIMARY KEY (key, field)
+);
+"""
+
+APP_JSON_FIELDS = ('review_summary', 'categories', 'user_tags', 'genres', 'developer', 'publisher')
+APP_FIELDS = ('app_name', 'release_date', 'metascore') + APP_JSON_FIELDS + ('game_desc',)
+
+PRICE_RE = re.compile(r'[^\d.]')
+
+
+def parse_price_cents(price):
+    if price is None:
+        return None
+    if isinstance(price, (int, long)):
+        return price
+    try:
+        return int(round(float(PRICE_RE.sub('', price)) * 100))
+    except ValueError:
+        return None
+
+
+def parse_percent(percent):
+    try:
+        return float(percent.strip().rstrip('%'))
+    except (AttributeError, ValueError):
+        return None
+
+
+class SteamCatalog:
+    def __init__(self, path, freshness=None):
+        self.path = path
+        self.freshness = dict(DEFAULT_FRESHNESS)
+        if freshness:
+            self.freshness.update(freshness)
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def mark_refreshed(self, key, field):
+        self.conn.execute('INSERT OR REPLACE INTO refreshed (key, field, updated) VALUES (?, ?, ?)',
+                          (str(key), field, time.time()))
+
+    def get_refreshed(self, key, field):
+        with self.lock:
+            row = self.conn.execute('SELECT updated FROM refreshed WHERE key = ? AND field = ?',
+                                    (str(key), field)).fetchone()
+        return row['updated'] if row else None
+
+    def is_stale(self, key, field):
+        updated = self.get_refreshed(key, field)
+        return updated is None or time.time() - updated >= self.freshness[field]
+
+    def save_app_info(self, app):
+        if not app.app_info:
+            return
+        app_id = str(app.app_id)
+        with self.lock, self.conn:
+            if app.app_info.get('release_date') is not None or app.app_info.get('game_desc') is not None:
+                values = [app.app_info.get(f) for f in APP_FIELDS]
+                for i, f in enumerate(APP_FIELDS):
+                    if f in APP_JSON_FIELDS:
+                        values[i] = json.dumps(values[i])
+                self.conn.execute('INSERT OR REPLACE INTO apps (app_id, {}) VALUES (?{})'.format(
+                    ', '.join(APP_FIELDS), ', ?' * len(APP_FIELDS)), [app_id] + values)
+                self.mark_refreshed(app_id, 'app_info')
+        if app.app_info.get('historical_low_price'):
+            self.save_historical_low(app_id, app.app_info['historical_low_price'])
+
+    def save_historical_low(self, app_id, hlp):
+        with self.lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO historical_lows (app_id, price, price_cents, discount, date) '
+                              'VALUES (?, ?, ?, ?, ?)',
+                              (str(app_id), hlp['price'], parse_price_cents(hlp['price']), hlp['discount'],
+                               hlp['date']))
+            self.mark_refreshed(app_id, 'historical_low')
+
+    def save_wishlist(self, wishlist):
+        user_id = str(wishlist.user_id)
+        rows = [(user_id, g['id'], g['title'], g['added_on'], g['url'], 1 if g.get('discounted') else 0,
+                 g.get('full_price'), g.get('discount_price'), g.get('discount_price_cents'),
+                 g.get('discount_percent')) for g in wishlist.wishlistgames]
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM wishlist_games WHERE user_id = ?', (user_id,))
+            self.conn.executemany('INSERT INTO wishlist_games (user_id, app_id, title, added_on, url, discounted, '
+                                  'full_price, discount_price, discount_price_cents, discount_percent) '
+                                  'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def save_global_achievements(self, achievements):
+        app_id = str(achievements.app_id)
+        rows = [(app_id, i, a['Primary Text'], a.get('Secondary Text'), parse_percent(a['Percent']))
+                for i, a in enumerate(achievements.achievements)]
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM global_achievements WHERE app_id = ?', (app_id,))
+            self.conn.executemany('INSERT INTO global_achievements (app_id, position, primary_text, secondary_text, '
+                                  'percent) VALUES (?, ?, ?, ?, ?)', rows)
+            self.mark_refreshed(app_id, 'achievements')
+
+    def get_app_info(self, app_id):
+        with self.lock:
+            row = self.conn.execute('SELECT * FROM apps WHERE app_id = ?', (str(app_id),)).fetchone()
+        if not row:
+            return None
+        app_info = dict((f, json.loads(row[f]) if f in APP_JSON_FIELDS else row[f]) for f in APP_FIELDS)
+        hlp = self.get_historical_low(app_id)
+        if hlp:
+            app_info['historical_low_price'] = hlp
+        return app_info
+
+    def get_historical_low(self, app_id):
+        with self.lock:
+            row = self.conn.execute('SELECT price, discount, date FROM historical_lows WHERE app_id = ?',
+                                    (str(app_id),)).fetchone()
+        return dict(row) if row else None
+
+    def get_wishlist_games(self, user_id):
+        with self.lock:
+            rows = self.conn.execute('SELECT app_id AS id, title, added_on, url, discounted, full_price, '
+                                     'discount_price, discount_percent FROM wishlist_games WHERE user_id = ?',
+                                     (str(user_id),)).fetchall()
+        games = []
+        for row in rows:
+            game = dict(row)
+            game['discounted'] = bool(game['discounted'])
+            games.append(game)
+        return games
+
+    def get_global_achievements(self, app_id):
+        with self.lock:
+            rows = self.conn.execute('SELECT primary_text, secondary_text, percent FROM global_achievements '
+                                     'WHERE app_id = ? ORDER BY position', (str(app_id),)).fetchall()
+        achievements = []
+        for row in rows:
+            a = {'Primary Text': row['primary_text']}
+            if row['secondary_text']:
+                a['Secondary Text'] = row['secondary_text']
+            a['Percent'] = '{}%'.format(row['percent'])
+            achievements.append(make_record(Achievement, a))
+        return achievements
+
+    def get_wishlist_games_at_historical_low(self, user_id=None):
+        query = ('SELECT w.user_id, w.app_id AS id, w.title, w.url, w.full_price, w.discount_price, '
+                 'w.discount_percent, h.price AS historical_low_price, h.date AS historical_low_date '
+                 'FROM wishlist_games w JOIN historical_lows h ON h.app_id = w.app_id '
+                 'WHERE w.discounted = 1 AND w.discount_price_cents <= h.price_cents')
+        params = ()
+        if user_id is not None:
+            query += ' AND w.user_id = ?'
+            params = (str(user_id),)
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(query + ' ORDER BY w.title', params).fetchall()]
+
+    def refresh_apps(self, app_ids, domtype='both', client=None, workers=4):
+        # Returns the ids that were refreshed; an app that fails to fetch is left stale for the next call.
+        fields = []
+        if domtype != 'steamdb':
+            fields.append('app_info')
+        if domtype != 'basic':
+            fields.append('historical_low')
+        stale = [a for a in app_ids if any(self.is_stale(a, f) for f in fields)]
+
+        def refresh(app_id):
+            try:
+                app = swc.SteamAppInfo(app_id=app_id, domtype=domtype, client=client)
+                app.initialize()
+                self.save_app_info(app)
+            except swc.APP_FETCH_ERRORS:
+                return False
+            return True
+
+        pool = ThreadPool(workers)
+        try:
+            refreshed = pool.map(refresh, stale)
+        finally:
+            pool.terminate()
+            pool.join()
+        return [a for a, ok in zip(stale, refreshed) if ok]
@@ -0,0 +1,141 @@
+import json
+import os
+import time
+from multiprocessing.pool import ThreadPool
+import SteamWebClasses as swc
+from SteamRecords import clear_strings
+from SteamWebFunctions import get_owned_games, get_credentials
+from SteamWebMetrics import get_metrics
+
+# A library entry is {'app_id', 'name', 'playtime_forever', 'app_info', 'achievements', 'synced'}, where achievements
+# is {'unlocked': n, 'total': n} for apps with stats and None otherwise.  Entries are written to the checkpoint as they
+# finish, so an interrupted sync picks up with the apps it hadn't reached.
+
+
+class LibrarySync:
+    def __init__(self, steamid=None, catalog=None, checkpoint_path=None, achievements=True, max_age=None, workers=8,
+                 checkpoint_every=50, client=None):
+        # max_age is how many seconds an entry is kept before the next sync enriches it again; None keeps it forever.
+        self.steamid = steamid or get_credentials()[1]
+        self.catalog = catalog
+        self.checkpoint_path = checkpoint_path
+        self.achievements = achievements
+        self.max_age = max_age
+        self.workers = workers
+        self.checkpoint_every = checkpoint_every
+        self.client = swc.get_client(client)
+        self.owned = None
+        self.library = {}
+        self.failed = {}
+        self.load_checkpoint()
+
+    def load_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        try:
+            with open(self.checkpoint_path) as f:
+                state = json.load(f)
+        except (IOError, ValueError):
+            return
+        if state.get('steamid') == self.steamid:
+            self.library = state.get('library') or {}
+            self.failed = state.get('failed') or {}
+
+    def save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'steamid': self.steamid, 'library': self.library, 'failed': self.failed,
+                       'updated': time.time()}, f)
+        os.rename(tmp_path, self.checkpoint_path)
+
+    def get_owned_games(self):
+        # One GetOwnedGames request per LibrarySync, with names and playtimes, so every app is enriched from it.
+        if self.owned is None:
+            with get_metrics().timed('library.owned_games'):
+                data = get_owned_games(self.steamid, include_appinfo=True, client=self.client)
+            self.owned = (data.get('response') or {}).get('games') or []
+        return self.owned
+
+    def is_synced(self, app_id):
+        entry = self.library.get(app_id)
+        return entry is not None and (self.max_age is None or time.time() - entry['synced'] < self.max_age)
+
+    def get_pending_games(self):
+        # Most played first, so a sync that stops early has covered the games that matter most.
+        pending = [g for g in self.get_owned_games() if not self.is_synced(str(g['appid']))]
+        pending.sort(key=lambda g: -g.get('playtime_forever', 0))
+        return pending
+
+    def get_app_info(self, app_id):
+        if self.catalog and not self.catalog.is_stale(app_id, 'app_info'):
+            app_info = self.catalog.get_app_info(app_id)
+            if app_info:
+                get_metrics().increment('library.catalog_hits')
+                return app_info
+        app = swc.SteamAppInfo(app_id=app_id, domtype='basic', client=self.client)
+        app.initialize_from_appdetails()
+        if self.catalog:
+            app.save(self.catalog)
+        return app.app_info
+
+    def get_achievements(self, app_id):
+        achievements = swc.SteamAppUserAchievements(self.steamid, app_id=app_id, client=self.client)
+        achievements.initialize()
+        unlocked = len(achievements.unlocked_achievements)
+        return {'unlocked': unlocked, 'total': unlocked + len(achievements.locked_achievements)}
+
+    def enrich(self, game):
+        # Returns (app_id, entry, error); entry is None when the app couldn't be enriched.
+        app_id = str(game['appid'])
+        entry = {'app_id': app_id, 'name': game.get('name'), 'playtime_forever': game.get('playtime_forever', 0),
+                 'app_info': None, 'achievements': None}
+        try:
+            with get_metrics().timed('library.enrich'):
+                app_info = self.get_app_info(app_id)
+                entry['app_info'] = dict(app_info) if app_info else None
+                # Apps without stats have no achievements page worth fetching.
+                if self.achievements and game.get('has_community_visible_stats'):
+                    entry['achievements'] = self.get_achievements(app_id)
+        except swc.APP_FETCH_ERRORS as e:
+            get_metrics().increment('library.failed')
+            return app_id, None, type(e).__name__
+        entry['synced'] = time.time()
+        return app_id, entry, None
+
+    def sync(self, limit=None):
+        # Enriches up to limit of the apps not yet synced, and returns how many were attempted.
+        pending = self.get_pending_games()
+        if limit is not None:
+            pending = pending[:limit]
+        done = 0
+        pool = ThreadPool(self.workers)
+        try:
+            for app_id, entry, error in pool.imap_unordered(self.enrich, pending):
+                if entry is None:
+                    self.failed[app_id] = error
+                else:
+                    self.library[app_id] = entry
+                    self.failed.pop(app_id, None)
+                done += 1
+                if done % self.checkpoint_every == 0:
+                    self.save_checkpoint()
+        finally:
+            pool.terminate()
+            pool.join()
+            self.save_checkpoint()
+            clear_strings()
+        return done
+
+    def get_library(self):
+        # Synced entries for the apps still owned, most played first.
+        owned = set(str(g['appid']) for g in self.get_owned_games())
+        entries = [e for app_id, e in self.library.items() if app_id in owned]
+        entries.sort(key=lambda e: (-e['playtime_forever'], e['name']))
+        return entries
+
+    def get_stats(self):
+        owned = self.get_owned_games()
+        synced = sum(1 for g in owned if self.is_synced(str(g['appid'])))
+        return {'owned': len(owned), 'synced': synced, 'pending': len(owned) - synced, 'failed': len(self.failed)}
@@ -0,0 +1,142 @@
+import os
+import time
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# One append-only file per column; every column holds one entry per recorded price.
+COLUMNS = (('app_id', 'L'), ('timestamp', 'd'), ('price_cents', 'l'), ('discount_pct', 'B'))
+
+
+class PriceHistory:
+    def __init__(self, path):
+        self.path = path
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+        self.columns = None
+
+    def get_column_path(self, name):
+        return os.path.join(self.path, name + '.bin')
+
+    def load(self):
+        columns = {}
+        for name, typecode in COLUMNS:
+            column = array(typecode)
+            column_path = self.get_column_path(name)
+            if os.path.exists(column_path):
+                with open(column_path, 'rb') as f:
+                    column.fromstring(f.read())
+            columns[name] = column
+        # A run interrupted halfway through an append can leave columns of different lengths.
+        length = min(len(c) for c in columns.values())
+        for name in columns:
+            del columns[name][length:]
+        self.columns = columns
+        return columns
+
+    def get_columns(self):
+        if self.columns is None:
+            self.load()
+        return self.columns
+
+    def append(self, rows):
+        new_columns = dict((name, array(typecode)) for name, typecode in COLUMNS)
+        for row in rows:
+            for name, _ in COLUMNS:
+                new_columns[name].append(row[name])
+        for name, _ in COLUMNS:
+            with open(self.get_column_path(name), 'ab') as f:
+                new_columns[name].tofile(f)
+        if self.columns is not None:
+            for name, _ in COLUMNS:
+                self.columns[name].extend(new_columns[name])
+        return len(new_columns['app_id'])
+
+    def record(self, wishlist, timestamp=None):
+        timestamp = timestamp or time.time()
+        rows = []
+        for game in wishlist.wishlistgames:
+            if game.get('errors'):
+                continue
+            if game['discounted']:
+                price_cents = game['discount_price_cents']
+            else:
+                price_cents = game['full_price_cents']
+            if price_cents is None:
+                continue
+            rows.append({'app_id': int(game['id']), 'timestamp': timestamp, 'price_cents': price_cents,
+                         'discount_pct': game['discount_pct']})
+        return self.append(rows)
+
+    def __len__(self):
+        return len(self.get_columns()['app_id'])
+
+    def __nonzero__(self):
+        # An empty history is still a history to record into; without this, __len__ makes it falsy.
+        return True
+
+    def get_arrays(self):
+        return dict((name, numpy.frombuffer(column.tostring(), dtype=column.typecode))
+                    for name, column in self.get_columns().items())
+
+    def get_all_time_lows(self):
+        columns = self.get_columns()
+        if numpy is None:
+            lows = {}
+            for app_id, ts, price in zip(columns['app_id'], columns['timestamp'], columns['price_cents']):
+                if app_id not in lows or price < lows[app_id][0]:
+                    lows[app_id] = (price, ts)
+            return lows
+
+        a = self.get_arrays()
+        # Sort by app, then price, then time, and keep the first row of each app: its earliest lowest price.
+        order = numpy.lexsort((a['timestamp'], a['price_cents'], a['app_id']))
+        app_ids = a['app_id'][order]
+        first = numpy.ones(len(app_ids), dtype=bool)
+        first[1:] = app_ids[1:] != app_ids[:-1]
+        lows = order[first]
+        return dict((int(app_id), (int(price), float(ts))) for app_id, price, ts in
+                    zip(a['app_id'][lows], a['price_cents'][lows], a['timestamp'][lows]))
+
+    def get_app_history(self, app_id):
+        columns = self.get_columns()
+        app_id = int(app_id)
+        if numpy is None:
+            rows = [(ts, price, pct) for a, ts, price, pct in zip(columns['app_id'], columns['timestamp'],
+                                                                 columns['price_cents'], columns['discount_pct'])
+                    if a == app_id]
+            return sorted(rows)
+
+        a = self.get_arrays()
+        mask = a['app_id'] == app_id
+        order = numpy.argsort(a['timestamp'][mask], kind='mergesort')
+        return zip(a['timestamp'][mask][order].tolist(), a['price_cents'][mask][order].tolist(),
+                   a['discount_pct'][mask][order].tolist())
+
+    def get_trend(self, app_id):
+        # Price change per day over the app's recorded history, from a least-squares fit.
+        history = self.get_app_history(app_id)
+        if len(history) < 2:
+            return 0.0
+        days = [ts / 86400.0 for ts, _, _ in history]
+        prices = [price for _, price, _ in history]
+        if numpy is not None:
+            return float(numpy.polyfit(days, prices, 1)[0])
+        mean_day = sum(days) / len(days)
+        mean_price = sum(prices) / float(len(prices))
+        var = sum((d - mean_day) ** 2 for d in days)
+        if not var:
+            return 0.0
+        return sum((d - mean_day) * (p - mean_price) for d, p in zip(days, prices)) / var
+
+    def get_games_at_all_time_low(self, games):
+        lows = self.get_all_time_lows()
+        at_low = []
+        for game in games:
+            low = lows.get(int(game['id']))
+            if low and game['discounted'] and game['discount_price_cents'] <= low[0]:
+                at_low.append(game)
+        return at_low
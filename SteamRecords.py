@@ -0,0 +1,175 @@
+# Compact records for what the scrapers collect in bulk.  A record keeps its values in __slots__ instead of a dict of
+# its own, and every string in it is shared with equal strings in other records, so a batch of many users' wishlists
+# holds one copy of each title, url and price.  Records still read like the dicts they replace: record['title'],
+# record.get('errors'), 'errors' in record, record.items() and dict(record) all work, and a key that was never set is
+# missing, the same as it would be from a dict.
+
+# The shared strings.  str and unicode can't be weakly referenced, so this is scoped to a batch instead: callers that
+# run for a long time call clear_strings() between batches, and the table starts over by itself once it holds
+# MAX_STRINGS.  Records keep their own references, so clearing only stops sharing with strings parsed afterwards.
+STRINGS = {}
+MAX_STRINGS = 200000
+# When False, make_record() hands back the plain dict it was given, as the scrapers used to; kept for benchmarking.
+enabled = True
+
+
+def clear_strings():
+    STRINGS.clear()
+
+
+def intern_value(value):
+    # intern() only takes str, so str and unicode values share one table, keyed by type so u'a' stays unicode.
+    if isinstance(value, basestring):
+        if type(value) not in (str, unicode):
+            # e.g. a bs4 NavigableString, which would keep its whole parse tree alive.
+            value = unicode(value)
+        if len(STRINGS) >= MAX_STRINGS:
+            clear_strings()
+        return STRINGS.setdefault((type(value), value), value)
+    if isinstance(value, list):
+        return [intern_value(v) for v in value]
+    return value
+
+
+def make_record(record_type, values):
+    return record_type(values) if enabled else values
+
+
+class RecordType(type):
+    def __new__(mcs, name, bases, namespace):
+        # fields lists the dict keys in order; a key that can't be an attribute name is given as (key, attribute).
+        # A field's attribute gets a slot unless the class defines it, as a property computed from other slots.
+        fields = tuple(f if isinstance(f, tuple) else (f, f) for f in namespace.get('fields', ()))
+        namespace['fields'] = fields
+        namespace['attributes'] = dict(fields)
+        namespace['__slots__'] = tuple(namespace.get('__slots__', ())) + tuple(
+            a for _, a in fields if a not in namespace)
+        return type.__new__(mcs, name, bases, namespace)
+
+
+class Record(object):
+    __metaclass__ = RecordType
+    __hash__ = None
+
+    def __init__(self, values=None, **kwargs):
+        self.update(values, **kwargs)
+
+    def update(self, values=None, **kwargs):
+        for source in (values or {}), kwargs:
+            for key in source.keys():
+                self[key] = source[key]
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, self.attributes[key])
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self.attributes:
+            raise KeyError(key)
+        setattr(self, self.attributes[key], intern_value(value))
+
+    def __delitem__(self, key):
+        try:
+            delattr(self, self.attributes[key])
+        except AttributeError:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.attributes and hasattr(self, self.attributes[key])
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *default):
+        try:
+            value = self[key]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        del self[key]
+        return value
+
+    def keys(self):
+        return [k for k, a in self.fields if hasattr(self, a)]
+
+    def values(self):
+        return [self[k] for k in self.keys()]
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def copy(self):
+        return type(self)(self)
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, (Record, dict)):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self.to_dict())
+
+    # Slots have no __dict__ to pickle, which the parse pipeline's processes need.
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self.update(state)
+
+
+class WishlistGame(Record):
+    fields = ('id', 'title', 'added_on', 'url', 'discounted', 'discount_price', 'discount_percent', 'full_price',
+              'discount_price_cents', 'discount_pct', 'full_price_cents', 'currency', 'errors')
+
+
+class AppInfo(Record):
+    fields = ('app_name', 'release_date', 'metascore', 'review_summary', 'categories', 'user_tags', 'genres',
+              'developer', 'publisher', 'game_desc', 'historical_low_price')
+
+
+class BrowseRow(Record):
+    fields = ('url', 'title', 'app_id', 'price', 'discount_pct', 'original_price', 'price_cents',
+              'original_price_cents', 'discount_pct_int')
+
+
+class Achievement(Record):
+    # 'Percent' keeps the page's text (shared, like every other string), and percent is the same value as a float.
+    __slots__ = ('percent', 'percent_string')
+    fields = (('Primary Text', 'name'), ('Secondary Text', 'description'), ('Percent', 'percent_text'),
+              ('Unlock Time', 'unlock_time'))
+
+    @property
+    def percent_text(self):
+        return self.percent_string
+
+    @percent_text.setter
+    def percent_text(self, value):
+        self.percent_string = value
+        try:
+            self.percent = float(value.strip().rstrip('%'))
+        except (AttributeError, ValueError):
+            self.percent = None
+
+    @percent_text.deleter
+    def percent_text(self):
+        del self.percent_string
+        del self.percent
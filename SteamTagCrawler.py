@@ -0,0 +1,91 @@
+import urllib
+from multiprocessing.pool import ThreadPool
+from bs4 import BeautifulSoup
+import SteamWebClasses as swc
+from SteamWebMetrics import get_metrics
+
+# The tabs of a tag page as named by the paginated contenthub endpoint, and the names SteamBrowseByTag uses for them.
+TABS = (('NewReleases', 'New Releases'),
+        ('TopSellers', 'Top Sellers'),
+        ('ConcurrentUsers', 'Popular'),
+        ('ComingSoon', 'Coming Soon'))
+
+PAGE_SIZE = 15
+
+
+class TagCrawler:
+    def __init__(self, tags, pages=3, page_size=PAGE_SIZE, tabs=None, workers=8, client=None):
+        self.tags = list(tags)
+        self.pages = pages
+        self.page_size = page_size
+        self.tabs = [t for t in TABS if tabs is None or t[0] in tabs or t[1] in tabs]
+        self.workers = workers
+        self.client = swc.get_client(client)
+        # app_id -> the row from whichever page listing it came back first, plus every tag it was listed under and
+        # every (tag, tab, position) it was listed at.
+        self.apps = {}
+
+    def get_page_url(self, tag, tab, start):
+        query = urllib.urlencode({'query': '', 'start': start, 'count': self.page_size, 'cc': 'US', 'l': 'english',
+                                  'v': 4, 'tag': tag.encode('utf-8') if isinstance(tag, unicode) else tag})
+        return '{}/contenthub/querypaginated/tags/{}/render/?{}'.format(swc.STEAM_STORE_URL, tab, query)
+
+    def fetch_page(self, page):
+        tag, tab, start = page
+        with get_metrics().timed('tags.fetch'):
+            r = self.client.get(self.get_page_url(tag, tab, start), 'tags')
+        try:
+            data = r.json()
+        except ValueError:
+            return page, [], 0
+        with get_metrics().timed('tags.parse'):
+            dom = BeautifulSoup(data.get('results_html') or '', 'html.parser')
+            rows = [row for _, row in swc.SteamBrowseByTag.parse_browse_rows(dom)]
+        return page, rows, data.get('total_count') or 0
+
+    def add_rows(self, page, rows):
+        tag, tab, start = page
+        tab_name = dict(TABS)[tab]
+        for i, row in enumerate(rows):
+            entry = self.apps.get(row['app_id'])
+            if entry is None:
+                entry = self.apps[row['app_id']] = dict(row, tags=[], positions=[])
+            if tag not in entry['tags']:
+                entry['tags'].append(tag)
+            entry['positions'].append((tag, tab_name, start + i))
+
+    def crawl(self):
+
+        # The first page of every tag and tab goes out at once; its total_count says how many more pages exist, and
+        # those go out together in a second round.
+        first_pages = [(tag, tab, 0) for tag in self.tags for tab, _ in self.tabs]
+        more_pages = []
+        pool = ThreadPool(self.workers)
+        try:
+            for page, rows, total in pool.imap_unordered(self.fetch_page, first_pages):
+                self.add_rows(page, rows)
+                tag, tab, _ = page
+                last = min(total, self.pages * self.page_size)
+                more_pages.extend((tag, tab, start) for start in range(self.page_size, last, self.page_size))
+            for page, rows, _ in pool.imap_unordered(self.fetch_page, more_pages):
+                self.add_rows(page, rows)
+        finally:
+            pool.terminate()
+            pool.join()
+        return len(self.apps)
+
+    def get_apps(self, tag=None, tab=None):
+        # Apps listed under a tag and/or tab, ordered by their best position there.
+        matches = []
+        for entry in self.apps.values():
+            positions = [p for t, n, p in entry['positions'] if (tag is None or t == tag) and (tab is None or n == tab)]
+            if positions:
+                matches.append((min(positions), entry))
+        matches.sort(key=lambda m: (m[0], m[1]['title']))
+        return [entry for _, entry in matches]
+
+    def get_apps_by_tag_count(self, min_tags=2):
+        # Apps listed under at least min_tags of the crawled tags, the most widely tagged first.
+        apps = [entry for entry in self.apps.values() if len(entry['tags']) >= min_tags]
+        apps.sort(key=lambda entry: (-len(entry['tags']), entry['title']))
+        return apps
@@ -0,0 +1,106 @@
+import threading
+from multiprocessing.pool import ThreadPool
+import SteamWebClasses as swc
+
+# Python 2 has no asyncio, so the non-blocking classes hand their blocking initialize() to a shared thread pool and
+# return its AsyncResult.  result.get() is the equivalent of awaiting it, and resolves to the initialized object.
+
+DEFAULT_THREADS = 64
+DEFAULT_LIMIT = 16
+
+executor = None
+executor_lock = threading.Lock()
+
+
+def get_executor():
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPool(DEFAULT_THREADS)
+        return executor
+
+
+def set_executor_size(threads):
+    global executor
+    with executor_lock:
+        if executor is not None:
+            executor.close()
+        executor = ThreadPool(threads)
+
+
+class AsyncInitializeMixin:
+    sync_class = None
+    running_sync = False
+
+    def run_sync(self, method, *args):
+        self.running_sync = True
+        try:
+            method(self, *args)
+        finally:
+            self.running_sync = False
+        return self
+
+    def initialize(self, callback=None):
+        # Anything the sync code calls back into while running on the pool (e.g. the appdetails fallback) stays sync.
+        if self.running_sync:
+            return self.sync_class.initialize(self)
+        return get_executor().apply_async(self.run_sync, (self.sync_class.initialize,), callback=callback)
+
+
+class AsyncSteamAppInfo(AsyncInitializeMixin, swc.SteamAppInfo):
+    sync_class = swc.SteamAppInfo
+
+    def initialize_from_appdetails(self, fallback=True, callback=None):
+        if self.running_sync:
+            return self.sync_class.initialize_from_appdetails(self, fallback)
+        return get_executor().apply_async(self.run_sync, (self.sync_class.initialize_from_appdetails, fallback),
+                                          callback=callback)
+
+    @classmethod
+    def bulk_fetch(cls, app_ids, client=None, workers=8, chunk_size=16, fallback=True, callback=None):
+        return get_executor().apply_async(swc.SteamAppInfo.bulk_fetch, (app_ids, client, workers, chunk_size, fallback),
+                                          callback=callback)
+
+
+class AsyncSteamAppGlobalAchievements(AsyncInitializeMixin, swc.SteamAppGlobalAchievements):
+    sync_class = swc.SteamAppGlobalAchievements
+
+
+class AsyncSteamAppUserAchievements(AsyncInitializeMixin, swc.SteamAppUserAchievements):
+    sync_class = swc.SteamAppUserAchievements
+
+
+class AsyncSteamWishList(AsyncInitializeMixin, swc.SteamWishList):
+    sync_class = swc.SteamWishList
+
+    def __init__(self, user_id, initialize=False, client=None, fetch_mode='page', workers=4):
+        swc.SteamWishList.__init__(self, user_id, initialize, client, fetch_mode, workers)
+
+
+class AsyncSteamBrowseByTag(AsyncInitializeMixin, swc.SteamBrowseByTag):
+    sync_class = swc.SteamBrowseByTag
+
+    def __init__(self, tagname, initialize=False, client=None):
+        swc.SteamBrowseByTag.__init__(self, tagname, initialize, client)
+
+
+def gather(objects, limit=DEFAULT_LIMIT, return_exceptions=False):
+    # Initializes every object on the shared pool with at most `limit` in flight, and returns them in order.
+    # Don't call this from inside a pool thread: it blocks until the whole batch is done.
+    semaphore = threading.BoundedSemaphore(limit)
+
+    def run(obj):
+        with semaphore:
+            return obj.run_sync(obj.sync_class.initialize)
+
+    pool = get_executor()
+    pending = [pool.apply_async(run, (obj,)) for obj in objects]
+    results = []
+    for p in pending:
+        try:
+            results.append(p.get())
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            results.append(e)
+    return results
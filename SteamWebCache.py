@@ -0,0 +1,185 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from email.utils import formatdate
+
+# Seconds a cached page is served without asking the server again, keyed by URL class.
+DEFAULT_TTLS = {'store': 6 * 60 * 60,
+                'steamdb': 6 * 60 * 60,
+                'appdetails': 6 * 60 * 60,
+                'search': 24 * 60 * 60,
+                'app_list': 24 * 60 * 60,
+                'achievements': 60 * 60,
+                'user_achievements': 10 * 60,
+                'tags': 60 * 60,
+                'wishlist': 10 * 60}
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class CachedResponse:
+    def __init__(self, url, status_code, content, encoding=None, headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding
+        self.headers = headers or {}
+        self.from_cache = True
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', 'replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class ResponseCache:
+    def __init__(self, path, ttls=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.max_bytes = max_bytes
+        self.lock = threading.RLock()
+        self.index = {}
+        self.size = 0
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+        self.load_index()
+        atexit.register(self.save_index)
+
+    @staticmethod
+    def get_key(url):
+        return hashlib.sha1(url.encode('utf-8') if isinstance(url, unicode) else url).hexdigest()
+
+    def get_index_path(self):
+        return os.path.join(self.path, 'index.json')
+
+    def get_body_path(self, key):
+        return os.path.join(self.path, key + '.body')
+
+    def load_index(self):
+        try:
+            with open(self.get_index_path()) as f:
+                self.index = json.load(f)
+        except (IOError, ValueError):
+            self.index = {}
+        self.size = sum(e['size'] for e in self.index.values())
+
+    def save_index(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            tmp_path = self.get_index_path() + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.index, f)
+            os.rename(tmp_path, self.get_index_path())
+            self.dirty = False
+
+    def is_fresh(self, entry):
+        return time.time() - entry['stored'] < self.ttls.get(entry['url_class'], 0)
+
+    def load_response(self, entry, key):
+        try:
+            with open(self.get_body_path(key), 'rb') as f:
+                content = f.read()
+        except IOError:
+            self.remove(key)
+            return None
+        entry['last_access'] = time.time()
+        self.dirty = True
+        return CachedResponse(entry['final_url'], entry['status_code'], content, entry['encoding'])
+
+    def remove(self, key):
+        entry = self.index.pop(key, None)
+        if not entry:
+            return
+        self.size -= entry['size']
+        self.dirty = True
+        try:
+            os.remove(self.get_body_path(key))
+        except OSError:
+            pass
+
+    def evict(self):
+        if self.size <= self.max_bytes:
+            return
+        for key in sorted(self.index, key=lambda k: self.index[k]['last_access']):
+            self.remove(key)
+            self.evictions += 1
+            if self.size <= self.max_bytes:
+                break
+
+    def store(self, url, url_class, r):
+        key = self.get_key(url)
+        with self.lock:
+            self.remove(key)
+            with open(self.get_body_path(key), 'wb') as f:
+                f.write(r.content)
+            now = time.time()
+            self.index[key] = {'url': url, 'url_class': url_class, 'final_url': r.url,
+                               'status_code': r.status_code, 'encoding': r.encoding,
+                               'etag': r.headers.get('ETag'), 'last_modified': r.headers.get('Last-Modified'),
+                               'stored': now, 'last_access': now, 'size': len(r.content)}
+            self.size += len(r.content)
+            self.dirty = True
+            self.evict()
+            self.save_index()
+
+    def get(self, url, url_class, fetch):
+        key = self.get_key(url)
+        headers = {}
+        with self.lock:
+            entry = self.index.get(key)
+            if entry and self.is_fresh(entry):
+                cached = self.load_response(entry, key)
+                if cached:
+                    self.hits += 1
+                    return cached
+                entry = None
+            if entry:
+                if entry['etag']:
+                    headers['If-None-Match'] = entry['etag']
+                if entry['last_modified']:
+                    headers['If-Modified-Since'] = entry['last_modified']
+                elif not entry['etag']:
+                    headers['If-Modified-Since'] = formatdate(entry['stored'], usegmt=True)
+
+        r = fetch(url, headers)
+
+        if r.status_code == 304:
+            with self.lock:
+                entry = self.index.get(key)
+                cached = self.load_response(entry, key) if entry else None
+                if cached:
+                    entry['stored'] = time.time()
+                    self.revalidations += 1
+                    return cached
+            # The entry was evicted or its body vanished from disk while we asked, so there is nothing to serve the
+            # 304 from; fetch again without the validators, outside the lock.
+            r = fetch(url, {})
+        with self.lock:
+            self.misses += 1
+        if r.status_code == 200:
+            self.store(url, url_class, r)
+        return r
+
+    def get_stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'revalidations': self.revalidations,
+                'evictions': self.evictions, 'entries': len(self.index), 'bytes': self.size}
+
+    def clear(self):
+        with self.lock:
+            for key in list(self.index):
+                self.remove(key)
+            self.save_index()
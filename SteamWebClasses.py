@@ -1,7 +1,109 @@
 import json
+import re
 from collections import defaultdict
-from bs4 import BeautifulSoup
+from multiprocessing.pool import ThreadPool
 import requests
+from bs4 import BeautifulSoup, SoupStrainer
+from SteamWebClient import SteamWebClient
+from SteamWebCoalesce import SingleFlight, LRUCache
+from SteamRecords import make_record, WishlistGame, AppInfo, BrowseRow, Achievement
+from SteamWebMetrics import get_metrics
+from SteamWishlistTable import WishlistTable
+
+STEAM_STORE_URL = 'http://store.steampowered.com'
+STEAM_COMMUNITY_URL = 'http://steamcommunity.com'
+STEAMDB_URL = 'https://steamdb.info'
+
+# Client used by every scraper that isn't handed one explicitly; see set_default_client().
+default_client = SteamWebClient()
+
+
+def set_default_client(client):
+    global default_client
+    default_client = client
+
+
+def get_client(client=None):
+    return client or default_client
+
+
+# Name to app id index consulted before a store search; None means every search_term goes to the store.
+default_app_index = None
+
+
+def set_app_index(index):
+    global default_app_index
+    default_app_index = index
+
+
+def get_app_index():
+    return default_app_index
+
+
+# The only parts of a store app page that get_app_info_from_dom() reads.
+STORE_PAGE_CLASSES = frozenset(['apphub_AppName', 'release_date', 'game_review_summary', 'user_reviews_summary_row',
+                                'popular_tags', 'details_block', 'game_description_snippet'])
+STORE_PAGE_IDS = frozenset(['game_area_metascore', 'category_block'])
+
+
+def is_store_page_element(name, attrs):
+    if attrs.get('id') in STORE_PAGE_IDS:
+        return True
+    classes = attrs.get('class')
+    if not classes:
+        return False
+    if isinstance(classes, basestring):
+        classes = classes.split()
+    return not STORE_PAGE_CLASSES.isdisjoint(classes)
+
+
+STORE_PAGE_STRAINER = SoupStrainer(is_store_page_element)
+
+# Each details_block label and the label that ends its list of values.
+DETAILS_SECTIONS = {'Genre': 'Developer', 'Developer': 'Publisher', 'Publisher': 'Release Date'}
+
+
+def split_details(tokens):
+    # Each section runs from the first occurrence of its label to the first occurrence of its terminator, and is
+    # empty when either is missing, as the label-by-label index() slicing always did; one pass finds the positions.
+    first = {}
+    for i, e in enumerate(tokens):
+        if e not in first and (e in DETAILS_SECTIONS or e == 'Release Date'):
+            first[e] = i
+    sections = {}
+    for label, terminator in DETAILS_SECTIONS.items():
+        if label in first and terminator in first:
+            sections[label] = tokens[first[label] + 1:first[terminator]]
+    return sections.get('Genre', []), sections.get('Developer', []), sections.get('Publisher', [])
+
+WISHLIST_DATA_MARKER = b'var g_rgWishlistData ='
+JSON_WHITESPACE = re.compile(br'\s*')
+JSON_DECODER = json.JSONDecoder()
+# Tab ids on a tag browse page, and the keys SteamBrowseByTag.games files their rows under.
+BROWSE_TAB_IDS = {'NewReleasesRows': 'New Releases',
+                  'TopSellersRows': 'Top Sellers',
+                  'ConcurrentUsersRows': 'Popular',
+                  'ComingSoonRows': 'Coming Soon'}
+BROWSE_ROW_FIELDS = {'tab_item_name': 'title',
+                     'discount_final_price': 'price',
+                     'discount_pct': 'discount_pct',
+                     'discount_original_price': 'original_price'}
+
+ORIGINAL_PRICE_RE = re.compile(r'class="discount_original_price">([^<]*)<')
+FINAL_PRICE_RE = re.compile(r'class="discount_final_price">([^<]*)<')
+PRICE_DIGITS_RE = re.compile(r'\d[\d.,]*')
+DISCOUNT_PCT_RE = re.compile(r'\d+')
+
+
+def get_price_cents(price):
+    # Handles both '1,234.56' and '1.234,56' style prices; anything after the first number is ignored.
+    m = PRICE_DIGITS_RE.search(price or '')
+    if not m:
+        return None
+    digits = m.group(0).rstrip('.,')
+    if len(digits) > 3 and digits[-3] in '.,':
+        return int(re.sub(r'\D', '', digits[:-3]) or 0) * 100 + int(digits[-2:])
+    return int(re.sub(r'\D', '', digits)) * 100
 
 
 class AppNotOnSteamError(Exception):
@@ -34,16 +136,36 @@ class DomNotSetError(Exception):
         Exception.__init__(self, "The dom was not set or could not be parsed.")
 
 
+# What can go wrong fetching one app, from the page not existing to a store page missing the parts we read.
+APP_FETCH_ERRORS = (DomNotSetError, AppNotOnSteamError, AppNotFoundError, AppRequiresAgeCheckError,
+                    AppAgeCheckFailedError, AppInitializationFailedError, requests.RequestException, AttributeError,
+                    IndexError, KeyError, ValueError)
+
+
 class SteamAppBase:
-    def __init__(self, app_id=None, search_term=None):
+    def __init__(self, app_id=None, search_term=None, client=None):
         self.app_id = app_id
         self.search_term = search_term
+        self.client = get_client(client)
 
     def get_app_id_from_search_term(self):
 
-        r = requests.get('http://store.steampowered.com/search/?term={}'.format(self.search_term))
-        search_dom = BeautifulSoup(r.text, 'lxml')
+        index = get_app_index()
+        if index:
+            app_id = index.get(self.search_term)
+            if app_id:
+                get_metrics().increment('search.index_hits')
+                if not self.app_id:
+                    self.app_id = app_id
+                return app_id
+
+        with get_metrics().timed('search.fetch'):
+            r = self.client.get('{}/search/?term={}'.format(STEAM_STORE_URL, self.search_term), 'search')
+        with get_metrics().timed('search.parse'):
+            search_dom = BeautifulSoup(r.text, 'lxml')
         app_id = search_dom.find(id='search_result_container').find('a').attrs['href'].split('/')[4]
+        if index:
+            index.put(self.search_term, app_id)
         if not self.app_id:
             self.app_id = app_id
         return app_id
@@ -56,13 +178,53 @@ class SteamAppBase:
             raise AppInitializationFailedError
 
 
+def resolve_app_ids(search_terms, client=None, workers=8):
+
+    # Returns {search_term: app_id}, with None for terms the store search finds nothing for.
+    def resolve(search_term):
+        try:
+            return SteamAppBase(search_term=search_term, client=client).get_app_id_from_search_term()
+        except (AttributeError, IndexError):
+            return None
+
+    index = get_app_index()
+    if index:
+        return index.resolve_many(search_terms, resolve, workers)
+    pool = ThreadPool(workers)
+    try:
+        search_terms = list(set(search_terms))
+        return dict(zip(search_terms, pool.map(resolve, search_terms)))
+    finally:
+        pool.terminate()
+        pool.join()
+
+
 class SteamAppInfo(SteamAppBase):
-    def __init__(self, app_id=None, search_term=None, domtype='both'):
-        SteamAppBase.__init__(self, app_id, search_term)
+    # When False, every accessor searches the store dom from the root, as it used to; kept for benchmarking.
+    index_store_dom = True
+    # Shared by every instance: concurrent initialize() calls for the same page and domtype share one fetch and
+    # parse, and the resulting app_info is reused for a while.  Set app_info_cache to None to always re-fetch.
+    singleflight = SingleFlight()
+    app_info_cache = LRUCache(1024, 15 * 60)
+    # The store accessor behind each lazily read field that only the store page has; see get_field().
+    store_field_getters = {'release_date': 'get_releasedate', 'metascore': 'get_metascore',
+                           'review_summary': 'get_review_summary', 'categories': 'get_categories',
+                           'user_tags': 'get_tags', 'game_desc': 'get_game_description_snippet'}
+
+    def __init__(self, app_id=None, search_term=None, domtype='both', client=None, parse_mode='full'):
+        SteamAppBase.__init__(self, app_id, search_term, client)
         self.steam_dom = None
         self.steamdb_dom = None
         self.domtype = domtype
+        self.parse_mode = parse_mode
+        self.store_elements = None
+        self.store_elements_dom = None
         self.app_info = None
+        # Set when initialize() was answered from app_info_cache, which keeps app_info but not the doms.
+        self.doms_from_cache = False
+        self.fields = {}
+        self.store_missing = False
+        self.steamdb_missing = False
 
     @staticmethod
     def clean_array(a):
@@ -74,47 +236,112 @@ class SteamAppInfo(SteamAppBase):
                 new_array.append(e.strip())
         return new_array
 
-    def get_basic_steamstore_app_dom(self):
-        r = requests.get("http://store.steampowered.com/app/{}/".format(self.app_id))
+    def fetch_store_page(self):
+        with get_metrics().timed('store.fetch'):
+            r = self.client.get('{}/app/{}/'.format(STEAM_STORE_URL, self.app_id), 'store')
         if 'app' not in r.url:
             raise AppNotOnSteamError
         elif 'agecheck' in r.url:
             raise AppRequiresAgeCheckError
-        self.steam_dom = BeautifulSoup(r.text, "html.parser")
+        return r.text
 
-    def get_agecheck_steamstore_app_dom(self):
-        s = requests.session()
-        s.get("http://store.steampowered.com/agecheck/app/{}/".format(self.app_id))
-        form_data = {'snr': '1_agecheck_agecheck__age-gate', 'ageDay': '1', 'ageMonth': 'April', 'ageYear': '1980'}
-        rpost = s.post("http://store.steampowered.com/agecheck/app/{}/".format(self.app_id), data=form_data)
-        if rpost.url == "http://store.steampowered.com/app/{}/".format(self.app_id):
-            self.steam_dom = BeautifulSoup(rpost.text, "html.parser")
-        else:
+    def get_basic_steamstore_app_dom(self):
+        self.parse_store_page(self.fetch_store_page())
+
+    def parse_store_page(self, text):
+        with get_metrics().timed('store.parse'):
+            if self.parse_mode == 'fast':
+                self.steam_dom = BeautifulSoup(text, "lxml", parse_only=STORE_PAGE_STRAINER)
+            else:
+                self.steam_dom = BeautifulSoup(text, "html.parser")
+
+    def fetch_agecheck_store_page(self):
+        get_metrics().increment('store.agecheck')
+        with get_metrics().timed('agecheck.fetch'):
+            self.client.get('{}/agecheck/app/{}/'.format(STEAM_STORE_URL, self.app_id))
+            form_data = {'snr': '1_agecheck_agecheck__age-gate', 'ageDay': '1', 'ageMonth': 'April',
+                         'ageYear': '1980'}
+            rpost = self.client.post('{}/agecheck/app/{}/'.format(STEAM_STORE_URL, self.app_id), data=form_data)
+        if rpost.url != '{}/app/{}/'.format(STEAM_STORE_URL, self.app_id):
             raise AppAgeCheckFailedError
+        return rpost.text
 
-    def get_steamdb_app_dom(self):
-        r = requests.get("https://steamdb.info/app/{}/info/".format(self.app_id))
+    def get_agecheck_steamstore_app_dom(self):
+        self.parse_store_page(self.fetch_agecheck_store_page())
+
+    def fetch_steamdb_page(self):
+        with get_metrics().timed('steamdb.fetch'):
+            r = self.client.get('{}/app/{}/info/'.format(STEAMDB_URL, self.app_id), 'steamdb')
         if r.status_code == 404:
             raise AppNotFoundError
-        self.steamdb_dom = BeautifulSoup(r.text, "lxml")
+        return r.text
+
+    def get_steamdb_app_dom(self):
+        self.parse_steamdb_page(self.fetch_steamdb_page())
+
+    def parse_steamdb_page(self, text):
+        with get_metrics().timed('steamdb.parse'):
+            self.steamdb_dom = BeautifulSoup(text, "lxml")
+
+    def load_cached_doms(self):
+        # After a cache hit, the first accessor that reads a dom fetches and parses the pages after all.
+        if self.doms_from_cache:
+            self.doms_from_cache = False
+            get_metrics().increment('app_info.lru_dom_fetches')
+            self.get_app_dom()
+
+    def get_store_elements(self):
+        self.load_cached_doms()
+        if self.store_elements_dom is self.steam_dom:
+            return self.store_elements
+        # One walk over the whole page collects every element the accessors below read.
+        elements = {'user_reviews_summary_row': []}
+        for tag in self.steam_dom.find_all(True):
+            tag_id = tag.get('id')
+            if tag_id in STORE_PAGE_IDS and tag_id not in elements:
+                elements[tag_id] = tag
+            for c in tag.get('class') or ():
+                if c == 'user_reviews_summary_row':
+                    elements[c].append(tag)
+                elif c in STORE_PAGE_CLASSES and c not in elements:
+                    elements[c] = tag
+        self.store_elements = elements
+        self.store_elements_dom = self.steam_dom
+        return elements
+
+    def get_store_element(self, key):
+        if not self.index_store_dom:
+            self.load_cached_doms()
+            if key in STORE_PAGE_IDS:
+                return self.steam_dom.find(id=key)
+            return self.steam_dom.find(class_=key)
+        return self.get_store_elements().get(key)
+
+    def get_review_rows(self):
+        if not self.index_store_dom:
+            self.load_cached_doms()
+            return self.steam_dom.find_all(class_='user_reviews_summary_row')
+        return self.get_store_elements()['user_reviews_summary_row']
 
     def get_tags(self):
-        tags = self.steam_dom.find(class_='popular_tags')
+        tags = self.get_store_element('popular_tags')
         tags_array = tags.text.replace('\t', '').replace('\n', '').replace('+', '').split('\r')
         return self.clean_array(tags_array)
 
     def get_categories(self):
-        cats_div = self.steam_dom.find(id='category_block')
-        cats_soup = BeautifulSoup(str(cats_div), 'lxml')
-        cats = cats_soup.find_all(class_='name')
+        cats_div = self.get_store_element('category_block')
+        if not cats_div:
+            return []
+        cats = cats_div.find_all(class_='name')
         cats_array = []
         for c in cats:
             cats_array.append(c.text)
         return cats_array
 
     def get_appname(self):
+        self.load_cached_doms()
         if self.domtype == 'basic':
-            name = self.steam_dom.find(class_='apphub_AppName')
+            name = self.get_store_element('apphub_AppName')
         elif self.domtype == 'steamdb':
             name = self.steamdb_dom.find(attrs={'itemprop': 'name'})
         else:
@@ -122,12 +349,12 @@ class SteamAppInfo(SteamAppBase):
         return name.text
 
     def get_releasedate(self):
-        rdate = self.steam_dom.find(class_='release_date')
+        rdate = self.get_store_element('release_date')
         date = rdate.text.replace('Release Date: ', '').replace('\t', '').replace('\n', '').replace('\r', '')
         return date
 
     def get_metascore(self):
-        score = self.steam_dom.find(id='game_area_metascore')
+        score = self.get_store_element('game_area_metascore')
         try:
             score_text = score.text
         except AttributeError:
@@ -136,8 +363,8 @@ class SteamAppInfo(SteamAppBase):
         return [int(s) for s in score_text.split() if s.isdigit()][0]
 
     def get_review_summary(self):
-        quick_summary = self.steam_dom.find(class_='game_review_summary')
-        review_divs = self.steam_dom.find_all(class_='user_reviews_summary_row')
+        quick_summary = self.get_store_element('game_review_summary')
+        review_divs = self.get_review_rows()
         recent_summary, full_summary = None, None
         for rd in review_divs:
             if not full_summary or not recent_summary:
@@ -149,31 +376,16 @@ class SteamAppInfo(SteamAppBase):
 
     def get_details(self):
 
-        details_block = self.steam_dom.find(class_="details_block")
+        details_block = self.get_store_element('details_block')
         dbt = details_block.text.replace('\r', '').replace('\t', '')
         sdbt = dbt.replace('\n', ',').replace(':', ',').split(',')
-        genres, developer, publisher = [], [], []
-        for e in sdbt:
-            if e == 'Genre':
-                try:
-                    genres = sdbt[sdbt.index('Genre') + 1:sdbt.index('Developer')]
-                except ValueError:
-                    pass
-            if e == 'Developer':
-                try:
-                    developer = sdbt[sdbt.index('Developer') + 1:sdbt.index('Publisher')]
-                except ValueError:
-                    pass
-            if e == 'Publisher':
-                try:
-                    publisher = sdbt[sdbt.index('Publisher') + 1:sdbt.index('Release Date')]
-                except ValueError:
-                    pass
+        genres, developer, publisher = split_details(sdbt)
 
         return self.clean_array(genres), self.clean_array(developer), self.clean_array(publisher)
 
     def get_steamdb_details(self):
 
+        self.load_cached_doms()
         try:
             developer = self.steamdb_dom.find(attrs={"itemprop": "author"}).text.split(",")
         except AttributeError:
@@ -187,6 +399,7 @@ class SteamAppInfo(SteamAppBase):
 
     def get_steamdb_historical_low_price(self):
 
+        self.load_cached_doms()
         hist_low_details = {}
         hist_low_td = self.steamdb_dom.find('td', attrs={'data-cc': 'us'}).parent.find_all('td')[-1]
         hist_low_details['date'] = hist_low_td.attrs['title']
@@ -196,29 +409,31 @@ class SteamAppInfo(SteamAppBase):
         return hist_low_details
 
     def get_game_description_snippet(self):
-        gds = self.steam_dom.find(class_="game_description_snippet")
+        gds = self.get_store_element('game_description_snippet')
         try:
             return gds.text.strip()
         except AttributeError:
             return None
 
     def get_app_info_from_dom(self):
+        self.load_cached_doms()
         if not self.steam_dom and not self.steamdb_dom:
             raise DomNotSetError
         if self.steam_dom:
             genres, developer, publisher = self.get_details()
-            self.app_info = {'app_name': self.get_appname(), 'release_date': self.get_releasedate(),
-                             'metascore': self.get_metascore(), 'review_summary': self.get_review_summary(),
-                             'categories': self.get_categories(), 'user_tags': self.get_tags(),
-                             'genres': genres, 'developer': developer,
-                             'publisher': publisher, 'game_desc': self.get_game_description_snippet()}
+            self.app_info = make_record(AppInfo, {
+                'app_name': self.get_appname(), 'release_date': self.get_releasedate(),
+                'metascore': self.get_metascore(), 'review_summary': self.get_review_summary(),
+                'categories': self.get_categories(), 'user_tags': self.get_tags(), 'genres': genres,
+                'developer': developer, 'publisher': publisher, 'game_desc': self.get_game_description_snippet()})
         if self.steamdb_dom:
             developer, publisher = self.get_steamdb_details()
             historical_low_price = self.get_steamdb_historical_low_price()
             if not self.app_info:
-                self.app_info = {'app_name': self.get_appname(), 'developer': developer, 'publisher': publisher,
-                                 'release_date': None, 'metascore': None, 'review_summary': None, 'categories': None,
-                                 'user_tags': None, 'genres': None, 'game_desc': None}
+                self.app_info = make_record(AppInfo, {
+                    'app_name': self.get_appname(), 'developer': developer, 'publisher': publisher,
+                    'release_date': None, 'metascore': None, 'review_summary': None, 'categories': None,
+                    'user_tags': None, 'genres': None, 'game_desc': None})
             self.app_info['historical_low_price'] = historical_low_price
 
     def print_app_info(self):
@@ -236,25 +451,36 @@ class SteamAppInfo(SteamAppBase):
             print self.app_info['genres']
             print self.app_info['game_desc']
 
-    def get_app_dom(self):
+    def fetch_app_pages(self):
+        # Fetches whichever pages the domtype needs, falling back the same way get_app_dom() always has, and returns
+        # their text unparsed as (store_text, steamdb_text); a page that isn't needed or is already parsed is None.
+        store_text, steamdb_text = None, None
         if not self.domtype:
             self.domtype = 'both'
         if self.domtype != 'steamdb' and not self.steam_dom:
             try:
-                self.get_basic_steamstore_app_dom()
+                store_text = self.fetch_store_page()
             except AppNotOnSteamError:
                 self.domtype = 'steamdb'
                 try:
-                    self.get_steamdb_app_dom()
+                    steamdb_text = self.fetch_steamdb_page()
                 except AppNotFoundError:
                     self.domtype = None
             except AppRequiresAgeCheckError:
                 try:
-                    self.get_agecheck_steamstore_app_dom()
+                    store_text = self.fetch_agecheck_store_page()
                 except AppAgeCheckFailedError:
                     self.domtype = None
-        if self.domtype != 'basic' and not self.steamdb_dom:
-            self.get_steamdb_app_dom()
+        if self.domtype != 'basic' and not self.steamdb_dom and steamdb_text is None:
+            steamdb_text = self.fetch_steamdb_page()
+        return store_text, steamdb_text
+
+    def get_app_dom(self):
+        store_text, steamdb_text = self.fetch_app_pages()
+        if store_text is not None:
+            self.parse_store_page(store_text)
+        if steamdb_text is not None:
+            self.parse_steamdb_page(steamdb_text)
 
     def initialize(self):
 
@@ -263,19 +489,208 @@ class SteamAppInfo(SteamAppBase):
         if not self.app_id:
             raise AppInitializationFailedError
 
-        self.get_app_dom()
-        self.get_app_info_from_dom()
+        key = ('{}/app/{}/'.format(STEAM_STORE_URL, self.app_id), self.domtype)
+        if self.app_info_cache is not None:
+            cached = self.app_info_cache.get(key)
+            if cached:
+                # Only app_info is kept, not the doms; load_cached_doms() fetches them if an accessor needs them.
+                get_metrics().increment('app_info.lru_hits')
+                self.domtype, app_info = cached
+                self.app_info = app_info.copy()
+                self.doms_from_cache = True
+                return
+
+        state, shared = self.singleflight.do(key, self.load_app_info)
+        if shared:
+            get_metrics().increment('app_info.coalesced')
+            self.domtype, self.steam_dom, self.steamdb_dom, app_info = state
+            self.app_info = app_info.copy() if app_info else app_info
+        elif self.app_info_cache is not None and self.app_info:
+            self.app_info_cache.put(key, (self.domtype, self.app_info.copy()))
+
+    def load_app_info(self):
+
+        with get_metrics().timed('app_info.initialize'):
+            self.get_app_dom()
+            with get_metrics().timed('app_info.extract'):
+                self.get_app_info_from_dom()
+        return self.domtype, self.steam_dom, self.steamdb_dom, self.app_info
+
+    # Reading one of these fetches and parses only the page that field comes from, extracts only that field, and
+    # remembers it; the app_info from initialize() is used instead when there is one.  Accessors that depend on the
+    # domtype aren't used, so app_name, developer and publisher come from the store page when the app has one.
+    app_name = property(lambda self: self.get_field('app_name'))
+    release_date = property(lambda self: self.get_field('release_date'))
+    metascore = property(lambda self: self.get_field('metascore'))
+    review_summary = property(lambda self: self.get_field('review_summary'))
+    categories = property(lambda self: self.get_field('categories'))
+    user_tags = property(lambda self: self.get_field('user_tags'))
+    genres = property(lambda self: self.get_field('genres'))
+    developer = property(lambda self: self.get_field('developer'))
+    publisher = property(lambda self: self.get_field('publisher'))
+    game_desc = property(lambda self: self.get_field('game_desc'))
+    historical_low_price = property(lambda self: self.get_field('historical_low_price'))
+
+    def load_store_dom(self):
+        # Fetches and parses the store page the first time a field needs it; False when the app has no store page.
+        if self.steam_dom is None and not self.store_missing:
+            SteamAppBase.initialize(self)
+            text = None
+            try:
+                text = self.fetch_store_page()
+            except AppNotOnSteamError:
+                pass
+            except AppRequiresAgeCheckError:
+                try:
+                    text = self.fetch_agecheck_store_page()
+                except AppAgeCheckFailedError:
+                    pass
+            if text is None:
+                self.store_missing = True
+            else:
+                self.parse_store_page(text)
+        return self.steam_dom is not None
+
+    def load_steamdb_dom(self):
+        if self.steamdb_dom is None and not self.steamdb_missing:
+            SteamAppBase.initialize(self)
+            try:
+                self.get_steamdb_app_dom()
+            except AppNotFoundError:
+                self.steamdb_missing = True
+        return self.steamdb_dom is not None
+
+    def compute_field(self, name):
+
+        if name == 'historical_low_price':
+            return self.get_steamdb_historical_low_price() if self.load_steamdb_dom() else None
+        if name in self.store_field_getters:
+            return getattr(self, self.store_field_getters[name])() if self.load_store_dom() else None
+        if name == 'app_name':
+            if self.load_store_dom():
+                return self.get_store_element('apphub_AppName').text
+            if self.load_steamdb_dom():
+                return self.steamdb_dom.find(attrs={'itemprop': 'name'}).text
+            return None
+        if name in ('genres', 'developer', 'publisher'):
+            if self.load_store_dom():
+                # The details block holds all three, so they're remembered together.
+                genres, developer, publisher = self.get_details()
+                self.fields.update(genres=genres, developer=developer, publisher=publisher)
+                return self.fields[name]
+            if name != 'genres' and self.load_steamdb_dom():
+                developer, publisher = self.get_steamdb_details()
+                return developer if name == 'developer' else publisher
+            return None
+        raise AttributeError(name)
+
+    def get_field(self, name):
+
+        if self.app_info and name in self.app_info:
+            return self.app_info[name]
+        if name in self.fields:
+            return self.fields[name]
+
+        SteamAppBase.initialize(self)
+        # Keyed by field name rather than domtype, so these never collide with the app_info initialize() caches.
+        key = ('{}/app/{}/'.format(STEAM_STORE_URL, self.app_id), name)
+        value = self.app_info_cache.get(key) if self.app_info_cache is not None else None
+        if value is not None:
+            get_metrics().increment('app_info.lru_hits')
+        else:
+            with get_metrics().timed('app_info.field'):
+                value, shared = self.singleflight.do(key, lambda: self.compute_field(name))
+            if shared:
+                get_metrics().increment('app_info.coalesced')
+            elif self.app_info_cache is not None and value is not None:
+                self.app_info_cache.put(key, value)
+        self.fields[name] = value
+        return value
+
+    def save(self, catalog):
+        catalog.save_app_info(self)
+
+    def get_appdetails(self):
+        with get_metrics().timed('appdetails.fetch'):
+            r = self.client.get('{}/api/appdetails/?appids={}&cc=us&l=english'.format(STEAM_STORE_URL, self.app_id),
+                                'appdetails')
+        if r.status_code != 200:
+            return None
+        try:
+            details = r.json()[str(self.app_id)]
+        except (ValueError, KeyError, TypeError):
+            return None
+        if not details or not details.get('success'):
+            return None
+        return details['data']
+
+    @staticmethod
+    def get_app_info_from_appdetails(data):
+        return make_record(AppInfo, {'app_name': data.get('name'),
+                'release_date': (data.get('release_date') or {}).get('date'),
+                'metascore': (data.get('metacritic') or {}).get('score'),
+                'review_summary': None,
+                'categories': [c['description'] for c in data.get('categories', [])],
+                'user_tags': None,
+                'genres': [g['description'] for g in data.get('genres', [])],
+                'developer': data.get('developers', []),
+                'publisher': data.get('publishers', []),
+                'game_desc': data.get('short_description')})
+
+    def initialize_from_appdetails(self, fallback=True):
+
+        if not self.app_id and self.search_term:
+            self.get_app_id_from_search_term()
+        if not self.app_id:
+            raise AppInitializationFailedError
+
+        data = self.get_appdetails()
+        if data:
+            self.app_info = self.get_app_info_from_appdetails(data)
+        elif fallback:
+            self.initialize()
+
+    @classmethod
+    def bulk_fetch(cls, app_ids, client=None, workers=8, chunk_size=16, fallback=True):
+
+        def fetch(app_id):
+            app = cls(app_id=app_id, domtype='basic', client=client)
+            # One app failing leaves None for that app, not an exception that throws away the whole batch.
+            try:
+                app.initialize_from_appdetails(fallback)
+            except APP_FETCH_ERRORS:
+                get_metrics().increment('appdetails.failed')
+                return str(app_id), None
+            return str(app_id), app.app_info
+
+        # appdetails only accepts a list of ids together with the price_overview filter, so each app is still its
+        # own request; the pool hands them out chunk_size at a time and keeps workers requests in flight.
+        pool = ThreadPool(workers)
+        try:
+            return dict(pool.imap_unordered(fetch, app_ids, chunk_size))
+        finally:
+            pool.terminate()
+            pool.join()
 
 
 class SteamAppGlobalAchievements(SteamAppBase):
-    def __init__(self, app_id=None, search_term=None):
-        SteamAppBase.__init__(self, app_id, search_term)
+    def __init__(self, app_id=None, search_term=None, client=None):
+        SteamAppBase.__init__(self, app_id, search_term, client)
         self.dom = None
         self.achievements = []
 
+    def fetch_achievements_page(self):
+        with get_metrics().timed('achievements.fetch'):
+            r = self.client.get('{}/stats/{}/achievements/'.format(STEAM_COMMUNITY_URL, self.app_id),
+                                'achievements')
+        return r.text
+
     def get_achievements_dom(self):
-        r = requests.get("http://steamcommunity.com/stats/{}/achievements/".format(self.app_id))
-        self.dom = BeautifulSoup(r.text, "html.parser")
+        self.parse_achievements_page(self.fetch_achievements_page())
+
+    def parse_achievements_page(self, text):
+        with get_metrics().timed('achievements.parse'):
+            self.dom = BeautifulSoup(text, "html.parser")
 
     def get_achievements_from_dom(self):
         if not self.dom:
@@ -287,7 +702,7 @@ class SteamAppGlobalAchievements(SteamAppBase):
             if stext:
                 a['Secondary Text'] = stext
             a['Percent'] = d.find(class_="achievePercent").text
-            self.achievements.append(a)
+            self.achievements.append(make_record(Achievement, a))
 
     def initialize(self):
 
@@ -296,22 +711,35 @@ class SteamAppGlobalAchievements(SteamAppBase):
         if not self.app_id:
             raise AppInitializationFailedError
 
-        self.get_achievements_dom()
-        self.get_achievements_from_dom()
+        with get_metrics().timed('achievements.initialize'):
+            self.get_achievements_dom()
+            with get_metrics().timed('achievements.extract'):
+                self.get_achievements_from_dom()
+
+    def save(self, catalog):
+        catalog.save_global_achievements(self)
 
 
 class SteamAppUserAchievements(SteamAppBase):
-    def __init__(self, user_id, app_id=None, search_term=None):
-        SteamAppBase.__init__(self, app_id, search_term)
+    def __init__(self, user_id, app_id=None, search_term=None, client=None):
+        SteamAppBase.__init__(self, app_id, search_term, client)
         self.user_id = user_id
         self.dom = None
         self.unlocked_achievements = []
         self.locked_achievements = []
 
+    def fetch_user_achievements_page(self):
+        with get_metrics().timed('user_achievements.fetch'):
+            r = self.client.get('{}/profiles/{}/stats/{}/achievements/'.format(STEAM_COMMUNITY_URL, self.user_id,
+                                                                               self.app_id), 'user_achievements')
+        return r.text
+
     def get_user_achievements_dom(self):
-        r = requests.get("http://steamcommunity.com/profiles/{}/stats/{}/achievements/".format(self.user_id,
-                                                                                               self.app_id))
-        self.dom = BeautifulSoup(r.text, "html.parser")
+        self.parse_user_achievements_page(self.fetch_user_achievements_page())
+
+    def parse_user_achievements_page(self, text):
+        with get_metrics().timed('user_achievements.parse'):
+            self.dom = BeautifulSoup(text, "html.parser")
 
     def get_user_achievments_from_dom(self):
         if not self.dom:
@@ -325,10 +753,10 @@ class SteamAppUserAchievements(SteamAppBase):
             a['Unlock Time'] = d.find(class_="achieveUnlockTime")
             if not a['Unlock Time']:
                 a.pop('Unlock Time')
-                self.locked_achievements.append(a)
+                self.locked_achievements.append(make_record(Achievement, a))
             else:
                 a['Unlock Time'] = a['Unlock Time'].text.strip().replace('Unlocked ', '')
-                self.unlocked_achievements.append(a)
+                self.unlocked_achievements.append(make_record(Achievement, a))
 
     def initialize(self):
 
@@ -337,28 +765,98 @@ class SteamAppUserAchievements(SteamAppBase):
         if not self.app_id:
             raise AppInitializationFailedError
 
-        self.get_user_achievements_dom()
-        self.get_user_achievments_from_dom()
+        with get_metrics().timed('user_achievements.initialize'):
+            self.get_user_achievements_dom()
+            with get_metrics().timed('user_achievements.extract'):
+                self.get_user_achievments_from_dom()
 
 
 class SteamWishList:
-    def __init__(self, user_id, initialize=True):
+    def __init__(self, user_id, initialize=True, client=None, fetch_mode='page', workers=4):
 
         self.user_id = user_id
-        self.dom = None
+        self.client = get_client(client)
+        self.fetch_mode = fetch_mode
+        self.workers = workers
+        self.page = None
         self.wishlistgames = []
         self.apps = None
         self.appinfo = None
+        self.table = None
+        self.table_size = 0
         if initialize:
             self.initialize()
 
     def get_wishlist_dom(self):
+        with get_metrics().timed('wishlist.fetch'):
+            try:
+                int(self.user_id)
+                r = self.client.get('{}/profiles/{}/wishlist/'.format(STEAM_COMMUNITY_URL, self.user_id),
+                                    'wishlist')
+            except ValueError:
+                r = self.client.get('{}/wishlist/id/{}/'.format(STEAM_STORE_URL, self.user_id), 'wishlist')
+        self.page = r.content
+
+    def get_wishlist_data_url(self, page):
         try:
             int(self.user_id)
-            r = requests.get('http://steamcommunity.com/profiles/{}/wishlist/'.format(self.user_id))
+            return '{}/wishlist/profiles/{}/wishlistdata/?p={}'.format(STEAM_STORE_URL, self.user_id, page)
         except ValueError:
-            r = requests.get('https://store.steampowered.com/wishlist/id/{}/'.format(self.user_id))
-        self.dom = BeautifulSoup(r.text, "html.parser")
+            return '{}/wishlist/id/{}/wishlistdata/?p={}'.format(STEAM_STORE_URL, self.user_id, page)
+
+    def get_wishlist_data_page(self, page):
+        with get_metrics().timed('wishlist.fetch'):
+            r = self.client.get(self.get_wishlist_data_url(page), 'wishlist')
+        with get_metrics().timed('wishlist.parse'):
+            data = r.json()
+        # Past the last page Steam answers with an empty list, and a private wishlist with {"success": 2}.
+        if not isinstance(data, dict) or 'success' in data:
+            return {}
+        return data
+
+    def iter_wishlist_data(self):
+
+        # The number of pages isn't known up front, so pages are requested `workers` at a time until one comes back
+        # empty; a wishlist that fits in the first batch costs a single round trip.  Each page is handed on as soon as
+        # it and the pages before it have arrived.
+        pool = ThreadPool(self.workers)
+        try:
+            start = 0
+            while True:
+                for data in pool.imap(self.get_wishlist_data_page, range(start, start + self.workers)):
+                    if not data:
+                        return
+                    yield data
+                start += self.workers
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def get_wishlist_data(self):
+        return list(self.iter_wishlist_data())
+
+    @staticmethod
+    def get_wishlist_rank(app):
+        # Unranked games have priority 0 and go after the ranked ones, as on the wishlist page.
+        return app['priority'] == 0, app['priority'], app['added']
+
+    def parse_wishlist_data(self, pages):
+
+        # Each entry carries its own added time and priority; an app that moved between pages while they were being
+        # fetched is only kept once.
+        self.apps = []
+        self.appinfo = {}
+        for data in pages:
+            for app_id, info in data.items():
+                if app_id not in self.appinfo:
+                    self.appinfo[app_id] = info
+                    self.apps.append({'appid': int(app_id), 'priority': info.get('priority', 0),
+                                      'added': info.get('added')})
+        self.apps.sort(key=self.get_wishlist_rank)
+
+        for app in self.apps:
+            app_id = str(app['appid'])
+            self.wishlistgames.append(self.get_wishlist_game(app_id, app, self.appinfo[app_id]))
 
     # Old dom parsing method, now obsolete
     # def parse_dom(self):
@@ -383,68 +881,117 @@ class SteamWishList:
     #                 wlrdef['errors'] = 'Could not determine price.'
     #         self.wishlistgames.append(wlrdef)
 
-    def parse_dom(self):
+    @staticmethod
+    def extract_json_value(page, start):
+        start = JSON_WHITESPACE.match(page, start).end()
+        return JSON_DECODER.raw_decode(page, start)
 
-        varstr = None
-        scripts = self.dom.find_all('script')
+    @staticmethod
+    def get_original_price(sub):
+        # The discount block is a small HTML snippet, but its original price is the only thing we need from it.
+        m = ORIGINAL_PRICE_RE.search(sub.get('discount_block') or '')
+        if m:
+            return m.group(1)
+        return '${:,.2f}'.format(sub['price'] / float(100 - sub['discount_pct']))
 
-        for script in scripts:
-            if 'var g_rgWishlistData =' not in script.text:
-                continue
-            varstr = script.text
-        if not varstr:
+    @staticmethod
+    def get_currency(sub):
+        # The wishlist data has no currency code, but the discount block shows the price with its symbol.
+        m = FINAL_PRICE_RE.search(sub.get('discount_block') or '')
+        if m:
+            return PRICE_DIGITS_RE.sub('', m.group(1)).strip() or '$'
+        return '$'
+
+    @classmethod
+    def get_wishlist_game(cls, app_id, app, info):
+
+        wlgame = {'id': app_id,
+                  'title': info['name'],
+                  'added_on': app['added'],
+                  'url': '{}/app/{}/'.format(STEAM_STORE_URL, app_id)}
+        try:
+            sub = info['subs'][0]
+            if sub['discount_pct'] == 0:
+                wlgame['discounted'] = False
+                wlgame['discount_price'] = None
+                wlgame['discount_percent'] = None
+                wlgame['full_price'] = sub['price']
+                wlgame['discount_price_cents'] = None
+                wlgame['discount_pct'] = 0
+                wlgame['full_price_cents'] = sub['price']
+            else:
+                wlgame['discounted'] = True
+                wlgame['discount_price'] = '${:,.2f}'.format(sub['price'] / 100.0)
+                wlgame['discount_percent'] = '-%' + str(sub['discount_pct'])
+                wlgame['full_price'] = cls.get_original_price(sub)
+                wlgame['discount_price_cents'] = sub['price']
+                wlgame['discount_pct'] = sub['discount_pct']
+                wlgame['full_price_cents'] = get_price_cents(wlgame['full_price'])
+            wlgame['currency'] = cls.get_currency(sub)
+        except IndexError:
+            wlgame['errors'] = 'Could not determine price.'
+        return make_record(WishlistGame, wlgame)
+
+    def parse_dom(self):
+
+        # The page is searched as raw bytes, and only the two inline JSON values are decoded.
+        start = self.page.find(WISHLIST_DATA_MARKER)
+        if start == -1:
             return
-        apps = json.loads(varstr[varstr.index('['):varstr.index(';')])
+        apps, end = self.extract_json_value(self.page, start + len(WISHLIST_DATA_MARKER))
+        appinfo, end = self.extract_json_value(self.page, self.page.index(b'=', end) + 1)
         self.apps = apps
-        varstr = varstr[varstr.index(';') + 1:]
-        appinfo = json.loads(varstr[varstr.index('{'):varstr.index('};') + 1])
         self.appinfo = appinfo
-        # return
-        for app in apps:
 
+        for app in apps:
             app_id = str(app['appid'])
-            wlgame = {'id': app_id}
-
-            if wlgame['id'] not in appinfo:
+            if app_id not in appinfo:
                 continue
-            wlgame['title'] = appinfo[wlgame['id']]['name']
-            wlgame['added_on'] = app['added']
-            wlgame['url'] = 'http://store.steampowered.com/app/{}/'.format(wlgame['id'])
-            try:
-                if appinfo[wlgame['id']]['subs'][0]['discount_pct'] == 0:
-                    wlgame['discounted'] = False
-                    wlgame['discount_price'] = None
-                    wlgame['discount_percent'] = None
-                    wlgame['full_price'] = appinfo[wlgame['id']]['subs'][0]['price']
-                else:
-                    parsed_discount_block = BeautifulSoup(appinfo[wlgame['id']]['subs'][0]['discount_block'],
-                                                          "html.parser")
-                    wlgame['discounted'] = True
-                    wlgame['discount_price'] = '${:,.2f}'.format(appinfo[wlgame['id']]['subs'][0]['price'] / 100.0)
-                    wlgame['discount_percent'] = '-%' + str(appinfo[wlgame['id']]['subs'][0]['discount_pct'])
-                    wlgame['full_price'] = parsed_discount_block.find('div', class_='discount_original_price').text
-            except IndexError:
-                wlgame['errors'] = 'Could not determine price.'
-            self.wishlistgames.append(wlgame)
+            self.wishlistgames.append(self.get_wishlist_game(app_id, app, appinfo[app_id]))
+
+    def iter_wishlist_games(self):
+
+        # Yields each page's games as soon as the page arrives, without building self.wishlistgames.  Games come out
+        # in wishlist order within a page, and an app that moved between pages while they were fetched comes out once.
+        seen = set()
+        for data in self.iter_wishlist_data():
+            apps = []
+            for app_id, info in data.items():
+                if app_id not in seen:
+                    seen.add(app_id)
+                    apps.append((self.get_wishlist_rank({'priority': info.get('priority', 0),
+                                                         'added': info.get('added')}), app_id, info))
+            apps.sort()
+            for _, app_id, info in apps:
+                yield self.get_wishlist_game(app_id, {'added': info.get('added')}, info)
 
     def initialize(self):
 
-        self.get_wishlist_dom()
-        self.parse_dom()
+        with get_metrics().timed('wishlist.initialize'):
+            if self.fetch_mode == 'data':
+                pages = self.get_wishlist_data()
+                with get_metrics().timed('wishlist.extract'):
+                    self.parse_wishlist_data(pages)
+                return
+            self.get_wishlist_dom()
+            with get_metrics().timed('wishlist.parse'):
+                self.parse_dom()
+
+    def save(self, catalog):
+        catalog.save_wishlist(self)
 
     @staticmethod
     def print_game(game):
 
+        line = u'{} ({}) Full price: {} Discount: {} Sale price: {}'.format(game['title'], game['url'],
+                                                                            game['full_price'],
+                                                                            game['discount_percent'],
+                                                                            game['discount_price'])
         try:
-            print '{} ({}) Full price: {} Discount: {} Sale price: {}'.format(game['title'], game['url'],
-                                                                              game['full_price'],
-                                                                              game['discount_percent'],
-                                                                              game['discount_price'])
+            print line
         except UnicodeEncodeError:
-            title = game['title'].encode('ascii', 'ignore')
-            print '{} ({}) Full price: {} Discount: {} Sale price: {}'.format(title, game['url'], game['full_price'],
-                                                                              game['discount_percent'],
-                                                                              game['discount_price'])
+            # stdout can't take the title or a non-dollar price (e.g. it's a pipe), so write UTF-8.
+            print line.encode('utf-8')
 
     @staticmethod
     def get_discount_price_float(g):
@@ -458,56 +1005,63 @@ class SteamWishList:
     def get_full_price_float(g):
         return float(g['full_price'].lstrip('$'))
 
-    def print_discounted_games(self, sort_type=None, max_price=None, min_discount=None):
+    def print_discounted_games(self, sort_type=None, max_price=None, min_discount=None, min_price=None,
+                               added_since=None, currency=None):
 
-        dg = self.get_discounted_games(sort_type, max_price, min_discount)
+        dg = self.get_discounted_games(sort_type, max_price, min_discount, min_price, added_since, currency)
 
         for game in dg:
             self.print_game(game)
 
-    def get_discounted_games(self, sort_type=None, max_price=None, min_discount=None):
+    def iter_discounted_games(self, games=None, max_price=None, min_discount=None, min_price=None,
+                              added_since=None, currency=None):
 
-        dg = []
-
-        for game in self.wishlistgames:
+        for game in self.wishlistgames if games is None else games:
             if 'discounted' in game and game['discounted']:
-                if max_price and (self.get_discount_price_float(game) > max_price):
+                if max_price and (game['discount_price_cents'] > max_price * 100):
+                    pass
+                elif min_price and (game['discount_price_cents'] < min_price * 100):
+                    pass
+                elif min_discount and (game['discount_pct'] < min_discount):
+                    pass
+                elif added_since and (game['added_on'] < added_since):
                     pass
-                elif min_discount and (self.get_discount_percent_int(game) < min_discount):
+                elif currency and (game['currency'] != currency):
                     pass
                 else:
-                    dg.append(game)
+                    yield game
 
-        if sort_type == 'percent':
-            dg.sort(key=lambda x: self.get_discount_percent_int(x), reverse=True)
-        elif sort_type == 'price':
-            dg.sort(key=lambda x: self.get_discount_price_float(x))
-        elif sort_type == 'discount':
-            dg.sort(key=lambda x: (self.get_full_price_float(x) - self.get_discount_price_float(x)), reverse=True)
-        elif sort_type == 'title':
-            dg.sort(key=lambda x: x['title'])
+    def get_table(self):
+        # Built once per parsed wishlist; rebuilt if more games have been added since.
+        if self.table is None or self.table_size != len(self.wishlistgames):
+            self.table = WishlistTable(self.wishlistgames)
+            self.table_size = len(self.wishlistgames)
+        return self.table
 
-        return dg
+    def get_discounted_games(self, sort_type=None, max_price=None, min_discount=None, min_price=None,
+                             added_since=None, currency=None):
 
-    def get_discounted_games_count_by_percent(self):
+        return self.get_table().select(sort_type, max_price=max_price, min_discount=min_discount,
+                                       min_price=min_price, added_since=added_since, currency=currency)
+
+    def get_discounted_games_counts(self, games=None):
 
-        discount_games = self.get_discounted_games()
         discount_percents = defaultdict(int)
+        discount_prices = defaultdict(int)
 
-        for game in discount_games:
+        for game in self.iter_discounted_games(games):
             discount_percents[game['discount_percent']] += 1
+            discount_prices[game['discount_price']] += 1
 
-        return discount_percents
+        return discount_percents, discount_prices
 
-    def get_discounted_games_count_by_price(self):
+    def get_discounted_games_count_by_percent(self):
 
-        discount_games = self.get_discounted_games()
-        discount_prices = defaultdict(int)
+        return self.get_discounted_games_counts()[0]
 
-        for game in discount_games:
-            discount_prices[game['discount_price']] += 1
+    def get_discounted_games_count_by_price(self):
 
-        return discount_prices
+        return self.get_discounted_games_counts()[1]
 
     def get_appids_removed_from_steam(self):
 
@@ -519,9 +1073,10 @@ class SteamWishList:
 
 class SteamBrowseByTag:
 
-    def __init__(self, tagname, initialize=True):
+    def __init__(self, tagname, initialize=True, client=None):
         self.tagname = tagname
-        self.url = 'http://store.steampowered.com/tags/en/{}/'.format(self.tagname)
+        self.client = get_client(client)
+        self.url = '{}/tags/en/{}/'.format(STEAM_STORE_URL, self.tagname)
         self.dom = None
         self.games = {'New Releases': [],
                       'Top Sellers': [],
@@ -531,51 +1086,58 @@ class SteamBrowseByTag:
             self.initialize()
 
     def get_tag_browse_dom(self):
-        r = requests.get(self.url)
-        self.dom = BeautifulSoup(r.text, "html.parser")
+        with get_metrics().timed('tags.fetch'):
+            r = self.client.get(self.url, 'tags')
+        self.parse_tag_browse_page(r.text)
 
-    def parse_dom(self):
-
-        def parse_browse_row(browse_row):
+    def parse_tag_browse_page(self, text):
+        with get_metrics().timed('tags.parse'):
+            self.dom = BeautifulSoup(text, "html.parser")
 
-            row_details = {'url': browse_row.attrs['href'],
-                           'title': browse_row.find('div', class_='tab_item_name').text,
-                           'app_id': browse_row.attrs['href'].split('/')[4]}
-            try:
-                row_details['price'] = browse_row.find('div', class_='discount_final_price').text
-            except AttributeError:
-                row_details['price'] = None
-            try:
-                row_details['discount_pct'] = browse_row.find('div', class_='discount_pct').text
-            except AttributeError:
-                row_details['discount_pct'] = None
-            try:
-                row_details['original_price'] = browse_row.find('div', class_='discount_original_price').text
-            except AttributeError:
-                row_details['original_price'] = None
-
-            return row_details
-
-        new_releases_rows = self.dom.find('div', id='NewReleasesRows')
-        for row in new_releases_rows.find_all('a'):
-            self.games['New Releases'].append(parse_browse_row(row))
-
-        top_sellers_rows = self.dom.find('div', id='TopSellersRows')
-        for row in top_sellers_rows.find_all('a'):
-            self.games['Top Sellers'].append(parse_browse_row(row))
+    @staticmethod
+    def parse_browse_row(browse_row):
+
+        # One walk over the row's descendants picks up the name and whichever price parts it has.
+        row_details = {'url': browse_row.attrs['href'],
+                       'title': None,
+                       'app_id': browse_row.attrs['href'].split('/')[4],
+                       'price': None,
+                       'discount_pct': None,
+                       'original_price': None}
+        for tag in browse_row.find_all(True):
+            for c in tag.get('class') or ():
+                if c in BROWSE_ROW_FIELDS and row_details[BROWSE_ROW_FIELDS[c]] is None:
+                    row_details[BROWSE_ROW_FIELDS[c]] = tag.text
+        # The same prices as numbers, parsed once here; a row that isn't on sale has no '-50%' text and a discount of 0.
+        row_details['price_cents'] = get_price_cents(row_details['price'])
+        row_details['original_price_cents'] = get_price_cents(row_details['original_price'])
+        m = DISCOUNT_PCT_RE.search(row_details['discount_pct'] or '')
+        row_details['discount_pct_int'] = int(m.group(0)) if m else 0
+        return make_record(BrowseRow, row_details)
+
+    @classmethod
+    def parse_browse_rows(cls, dom):
+
+        # Returns (tab id, row) for every row in the dom, in page order; rows outside a tab have a tab id of None.
+        rows = []
+        for row in dom.find_all('a', class_='tab_item'):
+            tab_id = None
+            for parent in row.parents:
+                if parent.get('id') in BROWSE_TAB_IDS:
+                    tab_id = parent['id']
+                    break
+            rows.append((tab_id, cls.parse_browse_row(row)))
+        return rows
 
-        popular_rows = self.dom.find('div', id='ConcurrentUsersRows')
-        for row in popular_rows.find_all('a'):
-            self.games['Popular'].append(parse_browse_row(row))
+    def parse_dom(self):
 
-        coming_soon_rows = self.dom.find('div', id='ComingSoonRows')
-        for row in coming_soon_rows:
-            try:
-                self.games['Coming Soon'].append(parse_browse_row(row))
-            except AttributeError:
-                pass
+        for tab_id, row in self.parse_browse_rows(self.dom):
+            if tab_id:
+                self.games[BROWSE_TAB_IDS[tab_id]].append(row)
 
     def initialize(self):
 
-        self.get_tag_browse_dom()
-        self.parse_dom()
+        with get_metrics().timed('tags.initialize'):
+            self.get_tag_browse_dom()
+            with get_metrics().timed('tags.extract'):
+                self.parse_dom()
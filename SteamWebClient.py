@@ -0,0 +1,126 @@
+import threading
+import time
+from urlparse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from SteamWebMetrics import get_metrics
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, self.rate))
+        self.tokens = self.capacity
+        self.updated = time.time()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.time()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class SteamWebClient:
+    def __init__(self, host_concurrency=4, rate=None, burst=None, retries=3, backoff=0.5, timeout=30, cache=None):
+        self.host_concurrency = host_concurrency
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = cache
+        self.sessions = {}
+        self.semaphores = {}
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.retry_count = 0
+
+    def get_host(self, url):
+        return urlparse(url).netloc
+
+    def get_session(self, url):
+        host = self.get_host(url)
+        with self.lock:
+            if host not in self.sessions:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.host_concurrency)
+                s.mount('http://', adapter)
+                s.mount('https://', adapter)
+                self.sessions[host] = s
+                self.semaphores[host] = threading.BoundedSemaphore(self.host_concurrency)
+                if self.rate:
+                    self.buckets[host] = TokenBucket(self.rate, self.burst)
+            return self.sessions[host]
+
+    def get_retry_delay(self, attempt, r=None):
+        if r is not None:
+            try:
+                return float(r.headers['Retry-After'])
+            except (KeyError, ValueError):
+                pass
+        return self.backoff * (2 ** attempt)
+
+    def request(self, method, url, **kwargs):
+        session = self.get_session(url)
+        host = self.get_host(url)
+        kwargs.setdefault('timeout', self.timeout)
+        metrics = get_metrics()
+        attempt = 0
+        while True:
+            queued = time.time()
+            if host in self.buckets:
+                self.buckets[host].acquire()
+            r = None
+            with self.lock:
+                self.request_count += 1
+            metrics.increment('http.requests')
+            try:
+                with self.semaphores[host]:
+                    start = time.time()
+                    metrics.timing('http.queue', start - queued)
+                    r = session.request(method, url, **kwargs)
+                    metrics.timing('http.request', time.time() - start)
+                # elapsed stops once the headers are parsed, so it covers connection setup and server time only.
+                metrics.timing('http.headers', r.elapsed.total_seconds())
+                metrics.increment('http.bytes', len(r.content))
+                metrics.increment('http.status.{}'.format(r.status_code))
+            except (requests.ConnectionError, requests.Timeout):
+                metrics.increment('http.errors')
+                if attempt >= self.retries:
+                    raise
+            if r is not None and (r.status_code not in RETRY_STATUSES or attempt >= self.retries):
+                return r
+            with self.lock:
+                self.retry_count += 1
+            metrics.increment('http.retries')
+            time.sleep(self.get_retry_delay(attempt, r))
+            attempt += 1
+
+    def fetch(self, url, headers=None):
+        return self.request('GET', url, headers=headers)
+
+    def get(self, url, url_class=None):
+        if self.cache and url_class:
+            r = self.cache.get(url, url_class, self.fetch)
+            get_metrics().increment('cache.hits' if getattr(r, 'from_cache', False) else 'cache.misses')
+            return r
+        return self.fetch(url)
+
+    def post(self, url, data=None, headers=None):
+        return self.request('POST', url, data=data, headers=headers)
+
+    def close(self):
+        with self.lock:
+            for s in self.sessions.values():
+                s.close()
+            self.sessions.clear()
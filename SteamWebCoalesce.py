@@ -0,0 +1,80 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+class Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    # The first caller for a key runs fn; callers that arrive while it is running wait and get the same result (or
+    # the same exception) instead of running it again.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error:
+                raise call.error[0], call.error[1], call.error[2]
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception:
+            call.error = sys.exc_info()
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result, False
+
+    def __len__(self):
+        with self.lock:
+            return len(self.calls)
+
+
+class LRUCache:
+    def __init__(self, max_size=1024, max_age=None):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return None
+            if self.max_age is not None and time.time() - entry[0] >= self.max_age:
+                return None
+            self.entries[key] = entry
+            return entry[1]
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (time.time(), value)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
@@ -1,5 +1,12 @@
+import urllib
 from bs4 import BeautifulSoup
 import requests
+from SteamWebClasses import split_details, get_client
+
+STEAM_API_URL = 'http://api.steampowered.com'
+
+# (api key path, steam id path) -> (api key, steam id); the files are read once per process.
+credentials = {}
 
 
 def get_tags(dom):
@@ -56,14 +63,7 @@ def get_details(dom):
     details_block = dom.find(class_="details_block")
     dbt = details_block.text.replace('\r', '').replace('\t', '')
     sdbt = dbt.replace('\n', ',').replace(':', ',').split(',')
-    genres, developer, publisher = [], [], []
-    for e in sdbt:
-        if e == 'Genre':
-            genres = sdbt[sdbt.index('Genre')+1:sdbt.index('Developer')]
-        if e == 'Developer':
-            developer = sdbt[sdbt.index('Developer')+1:sdbt.index('Publisher')]
-        if e == 'Publisher':
-            publisher = sdbt[sdbt.index('Publisher')+1:sdbt.index('Release Date')]
+    genres, developer, publisher = split_details(sdbt)
 
     return clean_array(genres), clean_array(developer), clean_array(publisher)
 
@@ -84,10 +84,11 @@ def get_html_dom(app_id):
 
 def get_app_info(app_id):
     dom = get_html_dom(app_id)
+    genres, developer, publisher = get_details(dom)
     app_info = {'app_name': get_appname(dom), 'release_date': get_releasedate(dom), 'metascore': get_metascore(dom),
                 'review_summary': get_review_summary(dom), 'categories': get_categories(dom),
-                'user_tags': get_tags(dom), 'genres': get_details(dom)[0], 'developer': get_details(dom)[1],
-                'publisher': get_details(dom)[2], 'game_desc': get_game_description_snippet(dom)}
+                'user_tags': get_tags(dom), 'genres': genres, 'developer': developer,
+                'publisher': publisher, 'game_desc': get_game_description_snippet(dom)}
     return app_info
 
 
@@ -105,12 +106,23 @@ def print_app_info(app_id):
     print app_info['game_desc']
 
 
-def get_owned_games():
-    with open('steamApiKey') as f_api:
-        api_key = f_api.read()
-    with open('steamID') as f_id:
-        steamid = f_id.read()
-    url = 'http://api.steampowered.com/IPlayerService/GetOwnedGames/v0001/'
-    params = 'key=%s&steamid=%s&format=json' % (api_key, steamid)
-    r = requests.get('%s?%s' % (url, params))
+def get_credentials(api_key_path='steamApiKey', steamid_path='steamID'):
+    paths = (api_key_path, steamid_path)
+    if paths not in credentials:
+        with open(api_key_path) as f_api:
+            api_key = f_api.read().strip()
+        with open(steamid_path) as f_id:
+            steamid = f_id.read().strip()
+        credentials[paths] = (api_key, steamid)
+    return credentials[paths]
+
+
+def get_owned_games(steamid=None, include_appinfo=False, client=None):
+    api_key, default_steamid = get_credentials()
+    params = {'key': api_key, 'steamid': steamid or default_steamid, 'format': 'json'}
+    if include_appinfo:
+        params.update(include_appinfo=1, include_played_free_games=1)
+    url = '{}/IPlayerService/GetOwnedGames/v0001/?{}'.format(STEAM_API_URL, urllib.urlencode(params))
+    # Not given a url class, so the response cache never writes the api key to disk.
+    r = get_client(client).get(url)
     return r.json()
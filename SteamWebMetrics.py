@@ -0,0 +1,110 @@
+import re
+import socket
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class StatsdSink:
+    def __init__(self, host='localhost', port=8125, prefix='steamdb'):
+        self.address = (host, port)
+        self.prefix = prefix
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(self, line):
+        try:
+            self.sock.sendto(line.encode('utf-8'), self.address)
+        except socket.error:
+            pass
+
+    def timing(self, name, seconds):
+        self.send('{}.{}:{:.3f}|ms'.format(self.prefix, name, seconds * 1000))
+
+    def increment(self, name, value=1):
+        self.send('{}.{}:{}|c'.format(self.prefix, name, value))
+
+
+class Metrics:
+    def __init__(self, sinks=None):
+        self.sinks = list(sinks or [])
+        self.lock = threading.Lock()
+        self.timers = defaultdict(lambda: [0, 0.0, 0.0])
+        self.counters = defaultdict(int)
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def timing(self, name, seconds):
+        with self.lock:
+            timer = self.timers[name]
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+        for sink in self.sinks:
+            sink.timing(name, seconds)
+
+    def increment(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+        for sink in self.sinks:
+            sink.increment(name, value)
+
+    @contextmanager
+    def timed(self, name):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.timing(name, time.time() - start)
+
+    def reset(self):
+        with self.lock:
+            self.timers.clear()
+            self.counters.clear()
+
+    def get_stats(self):
+        with self.lock:
+            timers = dict((name, {'count': t[0], 'total': t[1], 'max': t[2]}) for name, t in self.timers.items())
+            return {'timers': timers, 'counters': dict(self.counters)}
+
+    def format_report(self):
+        stats = self.get_stats()
+        lines = ['{:<32}{:>8}{:>12}{:>12}{:>12}'.format('phase', 'count', 'total s', 'mean ms', 'max ms')]
+        for name, t in sorted(stats['timers'].items()):
+            lines.append('{:<32}{:>8}{:>12.3f}{:>12.2f}{:>12.2f}'.format(name, t['count'], t['total'],
+                                                                      t['total'] * 1000 / t['count'],
+                                                                      t['max'] * 1000))
+        if stats['counters']:
+            lines.append('')
+            lines.append('{:<32}{:>8}'.format('counter', 'value'))
+            for name, value in sorted(stats['counters'].items()):
+                lines.append('{:<32}{:>8}'.format(name, value))
+        return '\n'.join(lines)
+
+    def format_prometheus(self, prefix='steamdb'):
+        stats = self.get_stats()
+        lines = []
+        for name, t in sorted(stats['timers'].items()):
+            metric = '{}_{}_seconds'.format(prefix, re.sub(r'\W', '_', name))
+            lines.append('# TYPE {} summary'.format(metric))
+            lines.append('{}_sum {}'.format(metric, t['total']))
+            lines.append('{}_count {}'.format(metric, t['count']))
+        for name, value in sorted(stats['counters'].items()):
+            metric = '{}_{}_total'.format(prefix, re.sub(r'\W', '_', name))
+            lines.append('# TYPE {} counter'.format(metric))
+            lines.append('{} {}'.format(metric, value))
+        return '\n'.join(lines) + '\n'
+
+
+# Metrics shared by the client and every scraper class; see set_metrics().
+metrics = Metrics()
+
+
+def get_metrics():
+    return metrics
+
+
+def set_metrics(m):
+    global metrics
+    metrics = m
@@ -0,0 +1,133 @@
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+import SteamWebClasses as swc
+from SteamWebMetrics import Metrics, set_metrics, get_metrics
+
+# Fetching stays on threads, where waiting on the network doesn't hold the GIL, and the page text is handed to a
+# process pool that runs the usual parse and extract code.  The functions the processes run are module level so they
+# can be pickled, and they only take and return plain data.
+
+SCRAPER_ERRORS = swc.APP_FETCH_ERRORS
+
+
+def init_worker():
+    # A forked worker can inherit the parent's metrics lock mid-use; give each worker its own.
+    set_metrics(Metrics())
+
+
+def parse_app_pages(app_id, domtype, parse_mode, store_text, steamdb_text):
+    app = swc.SteamAppInfo(app_id=app_id, domtype=domtype, parse_mode=parse_mode)
+    if store_text is not None:
+        app.parse_store_page(store_text)
+    if steamdb_text is not None:
+        app.parse_steamdb_page(steamdb_text)
+    # One page with an unexpected layout leaves None for its app instead of failing the whole batch.
+    try:
+        app.get_app_info_from_dom()
+    except SCRAPER_ERRORS:
+        return None
+    return app.app_info
+
+
+def parse_achievements_page(app_id, text):
+    achievements = swc.SteamAppGlobalAchievements(app_id=app_id)
+    achievements.parse_achievements_page(text)
+    try:
+        achievements.get_achievements_from_dom()
+    except SCRAPER_ERRORS:
+        return None
+    return achievements.achievements
+
+
+def parse_user_achievements_page(user_id, app_id, text):
+    achievements = swc.SteamAppUserAchievements(user_id, app_id=app_id)
+    achievements.parse_user_achievements_page(text)
+    try:
+        achievements.get_user_achievments_from_dom()
+    except SCRAPER_ERRORS:
+        return None
+    return {'unlocked': achievements.unlocked_achievements, 'locked': achievements.locked_achievements}
+
+
+class Ready:
+    # Stands in for an AsyncResult when there is nothing left to parse.
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class ParsePipeline:
+    def __init__(self, processes=None, io_workers=16, client=None, parse_mode='full'):
+        # The process pool is started first, before this object starts any threads of its own.
+        self.process_pool = multiprocessing.Pool(processes, init_worker)
+        self.io_pool = ThreadPool(io_workers)
+        self.client = swc.get_client(client)
+        self.parse_mode = parse_mode
+
+    def close(self):
+        self.io_pool.close()
+        self.process_pool.close()
+        self.io_pool.join()
+        self.process_pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def run(self, keys, fetch):
+        # fetch(key) runs on an I/O thread and returns an AsyncResult from the process pool (or a Ready).  The I/O
+        # threads go straight on to the next fetch while the processes parse, and results are collected at the end.
+        pending = self.io_pool.map(fetch, keys)
+        with get_metrics().timed('pipeline.parse_wait'):
+            return dict((str(key), p.get()) for key, p in zip(keys, pending))
+
+    def get_app_infos(self, app_ids, domtype='both'):
+
+        cache = swc.SteamAppInfo.app_info_cache
+
+        def fetch(app_id):
+            app = swc.SteamAppInfo(app_id=app_id, domtype=domtype, client=self.client)
+            key = ('{}/app/{}/'.format(swc.STEAM_STORE_URL, app_id), domtype)
+            cached = cache.get(key) if cache is not None else None
+            if cached:
+                return Ready(cached[1].copy())
+            try:
+                store_text, steamdb_text = app.fetch_app_pages()
+            except SCRAPER_ERRORS:
+                return Ready(None)
+
+            def store(app_info):
+                if cache is not None and app_info:
+                    cache.put(key, (app.domtype, app_info.copy()))
+
+            return self.process_pool.apply_async(parse_app_pages, (app_id, app.domtype, self.parse_mode,
+                                                                   store_text, steamdb_text), callback=store)
+
+        return self.run(app_ids, fetch)
+
+    def get_global_achievements(self, app_ids):
+
+        def fetch(app_id):
+            try:
+                text = swc.SteamAppGlobalAchievements(app_id=app_id, client=self.client).fetch_achievements_page()
+            except SCRAPER_ERRORS:
+                return Ready(None)
+            return self.process_pool.apply_async(parse_achievements_page, (app_id, text))
+
+        return self.run(app_ids, fetch)
+
+    def get_user_achievements(self, user_id, app_ids):
+
+        def fetch(app_id):
+            achievements = swc.SteamAppUserAchievements(user_id, app_id=app_id, client=self.client)
+            try:
+                text = achievements.fetch_user_achievements_page()
+            except SCRAPER_ERRORS:
+                return Ready(None)
+            return self.process_pool.apply_async(parse_user_achievements_page, (user_id, app_id, text))
+
+        return self.run(app_ids, fetch)
@@ -0,0 +1,93 @@
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# One compact column per numeric wishlist field, filled once from the integer fields that
+# SteamWishList.get_wishlist_game() precomputes, so filters and sorts never parse price strings.
+COLUMNS = (('discounted', 'B'), ('discount_price_cents', 'l'), ('full_price_cents', 'l'), ('discount_pct', 'B'),
+           ('added_on', 'd'))
+
+
+class WishlistTable:
+    def __init__(self, games):
+        self.games = [g for g in games if not g.get('errors')]
+        self.currencies = [g['currency'] for g in self.games]
+        self.columns = dict((name, array(typecode, (int(g[name] or 0) if typecode != 'd' else float(g[name] or 0)
+                                                    for g in self.games)))
+                            for name, typecode in COLUMNS)
+        self.arrays = None
+        if numpy is not None:
+            self.arrays = dict((name, numpy.frombuffer(column.tostring(), dtype=column.typecode))
+                               for name, column in self.columns.items())
+
+    def __len__(self):
+        return len(self.games)
+
+    def filter(self, discounted=True, max_price=None, min_price=None, min_discount=None, added_since=None,
+               currency=None):
+        # Prices are in the same units as the rest of the wishlist code (dollars); returns row indices in order.
+        if self.arrays is not None:
+            a = self.arrays
+            mask = numpy.ones(len(self.games), dtype=bool)
+            if discounted:
+                mask &= a['discounted'] == 1
+            if max_price:
+                mask &= a['discount_price_cents'] <= max_price * 100
+            if min_price:
+                mask &= a['discount_price_cents'] >= min_price * 100
+            if min_discount:
+                mask &= a['discount_pct'] >= min_discount
+            if added_since:
+                mask &= a['added_on'] >= added_since
+            if currency:
+                mask &= numpy.array([c == currency for c in self.currencies], dtype=bool)
+            return numpy.flatnonzero(mask)
+
+        c = self.columns
+        rows = []
+        for i in range(len(self.games)):
+            if discounted and not c['discounted'][i]:
+                continue
+            if max_price and c['discount_price_cents'][i] > max_price * 100:
+                continue
+            if min_price and c['discount_price_cents'][i] < min_price * 100:
+                continue
+            if min_discount and c['discount_pct'][i] < min_discount:
+                continue
+            if added_since and c['added_on'][i] < added_since:
+                continue
+            if currency and self.currencies[i] != currency:
+                continue
+            rows.append(i)
+        return rows
+
+    def sort(self, rows, sort_type=None):
+        # Sorts are stable, and descending sorts keep ties in wishlist order, the same as list.sort(reverse=True).
+        if sort_type == 'title':
+            return sorted(rows, key=lambda i: self.games[i]['title'])
+        if sort_type not in ('percent', 'price', 'discount'):
+            return rows
+
+        if self.arrays is not None:
+            a = self.arrays
+            rows = numpy.asarray(rows, dtype=numpy.intp)
+            if sort_type == 'percent':
+                key = -a['discount_pct'][rows].astype(numpy.int64)
+            elif sort_type == 'price':
+                key = a['discount_price_cents'][rows]
+            else:
+                key = a['discount_price_cents'][rows] - a['full_price_cents'][rows]
+            return rows[numpy.argsort(key, kind='mergesort')]
+
+        c = self.columns
+        if sort_type == 'percent':
+            return sorted(rows, key=lambda i: -c['discount_pct'][i])
+        elif sort_type == 'price':
+            return sorted(rows, key=lambda i: c['discount_price_cents'][i])
+        return sorted(rows, key=lambda i: c['discount_price_cents'][i] - c['full_price_cents'][i])
+
+    def select(self, sort_type=None, **filters):
+        return [self.games[i] for i in self.sort(self.filter(**filters), sort_type)]
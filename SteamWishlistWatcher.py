@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import sys
+import time
+from multiprocessing.pool import ThreadPool
+import requests
+import SteamWebClasses as swc
+from SteamRecords import clear_strings
+from SteamWebMetrics import get_metrics
+
+# A snapshot is {app_id: [discount_price_cents, discount_pct, title, url]} for the discounted games that pass the
+# filters.  Each poll is diffed against the previous one, and only games whose sale is new or different are enriched.
+
+SALE_STARTED = 'sale_started'
+SALE_CHANGED = 'sale_changed'
+SALE_ENDED = 'sale_ended'
+
+
+class TextSink:
+    def __init__(self, out=None):
+        self.out = out or sys.stdout
+
+    def emit(self, event):
+        line = u'{}: {} ({})'.format(event['event'], event['title'], event['url'])
+        if event['event'] != SALE_ENDED:
+            line += u' Discount: -%{} Sale price: ${:,.2f}'.format(event['discount_pct'],
+                                                                  event['discount_price_cents'] / 100.0)
+        if event.get('historical_low'):
+            line += u' Historical low: {}'.format(event['historical_low']['price'])
+        self.out.write(line.encode('utf-8') + '\n')
+        self.out.flush()
+
+
+class JsonLinesSink:
+    def __init__(self, out=None):
+        self.out = out or sys.stdout
+
+    def emit(self, event):
+        self.out.write(json.dumps(event, sort_keys=True) + '\n')
+        self.out.flush()
+
+
+class WebhookSink:
+    def __init__(self, url, client=None):
+        self.url = url
+        self.client = swc.get_client(client)
+
+    def emit(self, event):
+        self.client.post(self.url, data=json.dumps(event), headers={'Content-Type': 'application/json'})
+
+
+class WishlistWatcher:
+    def __init__(self, user_id, filters=None, enrich=None, sinks=None, state_path=None, fetch_mode='page',
+                 workers=4, client=None):
+        # enrich(game) returns a dict merged into the game's event, or None to drop the event (e.g. not at a low).
+        self.user_id = user_id
+        self.filters = filters or {}
+        self.enrich = enrich
+        self.sinks = list(sinks or [TextSink()])
+        self.state_path = state_path
+        self.fetch_mode = fetch_mode
+        self.workers = workers
+        self.client = swc.get_client(client)
+        self.snapshot = None
+        self.page_hash = None
+        self.polls = 0
+        self.enriched = 0
+        self.load_state()
+
+    def load_state(self):
+        if not self.state_path:
+            return
+        try:
+            with open(self.state_path) as f:
+                self.snapshot = json.load(f)['snapshot']
+        except (IOError, ValueError, KeyError):
+            self.snapshot = None
+
+    def save_state(self):
+        if not self.state_path:
+            return
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'user_id': self.user_id, 'snapshot': self.snapshot, 'updated': time.time()}, f)
+        os.rename(tmp_path, self.state_path)
+
+    def fetch(self):
+        # Returns the wishlist, or None when the page is byte for byte the one the last poll saw.
+        wishlist = swc.SteamWishList(self.user_id, initialize=False, client=self.client, fetch_mode=self.fetch_mode,
+                                     workers=self.workers)
+        if self.fetch_mode != 'page':
+            wishlist.initialize()
+            return wishlist
+        wishlist.get_wishlist_dom()
+        page_hash = hashlib.sha1(wishlist.page).hexdigest()
+        if page_hash == self.page_hash and self.snapshot is not None:
+            return None
+        self.page_hash = page_hash
+        with get_metrics().timed('wishlist.parse'):
+            wishlist.parse_dom()
+        return wishlist
+
+    def get_snapshot(self, wishlist):
+        return dict((g['id'], [g['discount_price_cents'], g['discount_pct'], g['title'], g['url']])
+                    for g in wishlist.iter_discounted_games(**self.filters))
+
+    @staticmethod
+    def diff(old, new):
+        # Returns [(event, app_id)]; a sale is 'changed' when its price or discount differs from the last poll.
+        changes = []
+        for app_id, row in new.items():
+            if app_id not in old:
+                changes.append((SALE_STARTED, app_id))
+            elif old[app_id][:2] != row[:2]:
+                changes.append((SALE_CHANGED, app_id))
+        for app_id in old:
+            if app_id not in new:
+                changes.append((SALE_ENDED, app_id))
+        return changes
+
+    def get_event(self, kind, app_id, row):
+        return {'event': kind, 'user_id': self.user_id, 'app_id': app_id, 'title': row[2], 'url': row[3],
+                'discount_price_cents': row[0], 'discount_pct': row[1], 'time': time.time()}
+
+    def report_error(self, what, app_id, e):
+        get_metrics().increment('watch.{}_errors'.format(what))
+        sys.stderr.write('Could not {} {}: {}: {}\n'.format(what, app_id, type(e).__name__, e))
+
+    def enrich_event(self, event):
+        # Returns (event, info, error) instead of raising, so one app's failure doesn't stop the others.
+        try:
+            return event, self.enrich({'id': event['app_id'], 'title': event['title'], 'url': event['url'],
+                                       'discount_price_cents': event['discount_price_cents']}), None
+        except Exception as e:
+            return event, None, e
+
+    def emit(self, event):
+        # True only when every sink took the event.
+        delivered = True
+        for sink in self.sinks:
+            try:
+                sink.emit(event)
+            except Exception as e:
+                self.report_error('emit', event['app_id'], e)
+                delivered = False
+        return delivered
+
+    def poll(self):
+
+        self.polls += 1
+        with get_metrics().timed('watch.poll'):
+            wishlist = self.fetch()
+            if wishlist is None:
+                get_metrics().increment('watch.unchanged')
+                return []
+            new = self.get_snapshot(wishlist)
+            old = self.snapshot
+            if old is None:
+                # The first poll only records where things stand.
+                self.snapshot = new
+                self.save_state()
+                clear_strings()
+                return []
+
+            changes = self.diff(old, new)
+            events = [self.get_event(kind, app_id, new[app_id] if kind != SALE_ENDED else old[app_id])
+                      for kind, app_id in changes]
+            # Apps whose change wasn't fully handled keep their old snapshot row, so the next poll reports them again.
+            retry = set()
+            dropped = set()
+            to_enrich = [e for e in events if e['event'] != SALE_ENDED]
+            if self.enrich and to_enrich:
+                self.enriched += len(to_enrich)
+                pool = ThreadPool(self.workers)
+                try:
+                    results = pool.map(self.enrich_event, to_enrich)
+                finally:
+                    pool.terminate()
+                    pool.join()
+                for event, info, error in results:
+                    if error is not None:
+                        self.report_error('enrich', event['app_id'], error)
+                        retry.add(event['app_id'])
+                    elif info is None:
+                        dropped.add(event['app_id'])
+                    else:
+                        event.update(info)
+            events = [e for e in events if e['app_id'] not in dropped and e['app_id'] not in retry]
+
+        emitted = []
+        for event in events:
+            if self.emit(event):
+                emitted.append(event)
+            else:
+                retry.add(event['app_id'])
+
+        # Only now, with every event out, does the snapshot move on.
+        for app_id in retry:
+            if app_id in old:
+                new[app_id] = old[app_id]
+            else:
+                new.pop(app_id, None)
+        if retry:
+            # Otherwise an unchanged page would skip the retry.
+            self.page_hash = None
+        self.snapshot = new
+        self.save_state()
+        # Each poll is its own batch; the snapshot keeps plain rows, not the records.
+        clear_strings()
+        return emitted
+
+    def run(self, interval, polls=None):
+        while polls is None or self.polls < polls:
+            started = time.time()
+            try:
+                self.poll()
+            except requests.RequestException as e:
+                # The wishlist couldn't be fetched this time; the snapshot is unchanged, so nothing is lost.
+                self.report_error('poll', self.user_id, e)
+            if polls is not None and self.polls >= polls:
+                break
+            time.sleep(max(0, interval - (time.time() - started)))
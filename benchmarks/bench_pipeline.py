@@ -0,0 +1,51 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing.pool import ThreadPool
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import SteamWebPipeline
+from fixtures import load_fixture
+
+
+def parse_store(text):
+    return SteamWebPipeline.parse_app_pages(0, 'basic', 'full', text, None)
+
+
+def run(pool, texts):
+    start = time.time()
+    results = pool.map(parse_store, texts, 1)
+    return time.time() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-n', '--pages', type=int, default=64)
+    parser.add_argument('-p', '--processes', type=int, default=multiprocessing.cpu_count())
+
+    args = parser.parse_args()
+
+    texts = [load_fixture('store_app.html').decode('utf-8')] * args.pages
+
+    # The thread pool is what parsing on the fetch threads amounts to: one core, however many threads there are.
+    process_pool = multiprocessing.Pool(args.processes, SteamWebPipeline.init_worker)
+    thread_pool = ThreadPool(args.processes)
+    try:
+        thread_time, thread_results = run(thread_pool, texts)
+        process_time, process_results = run(process_pool, texts)
+    finally:
+        thread_pool.terminate()
+        process_pool.terminate()
+
+    if thread_results != process_results:
+        print 'WARNING: threads and processes disagree'
+    print '{:<12}{:>10}{:>14}'.format('pool', 'wall s', 'pages/s')
+    print '{:<12}{:>10.2f}{:>14.1f}'.format('threads', thread_time, args.pages / thread_time)
+    print '{:<12}{:>10.2f}{:>14.1f}'.format('processes', process_time, args.pages / process_time)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import gc
+import os
+import resource
+import sys
+from multiprocessing import Process, Queue
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import SteamRecords
+import SteamWebClasses as swc
+import fixtures
+
+MODES = ('dicts', 'records')
+
+
+def get_retained_bytes(games):
+    # Every distinct object the games hold on to, counted once however many games share it.
+    seen = set()
+    total = 0
+    pending = list(games)
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, (dict, SteamRecords.Record)):
+            pending.extend(obj.values())
+        elif isinstance(obj, list):
+            pending.extend(obj)
+    return total
+
+
+def run_mode(mode, users, wishlists, count, results):
+    SteamRecords.enabled = mode == 'records'
+    gc.collect()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Users are spread over a handful of distinct wishlists, so titles, urls and prices repeat across the batch the
+    # way popular games do across real users.
+    games = []
+    for user in range(users):
+        wishlist = swc.SteamWishList(user, initialize=False)
+        wishlist.page = fixtures.wishlist_page(count, seed=user % wishlists).encode('utf-8')
+        wishlist.parse_dom()
+        games.extend(wishlist.wishlistgames)
+        del wishlist
+
+    gc.collect()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((mode, len(games), get_retained_bytes(games), rss_after - rss_before))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-u', '--users', type=int, default=50)
+    parser.add_argument('-w', '--wishlists', type=int, default=5)
+    parser.add_argument('-n', '--games', type=int, default=500)
+
+    args = parser.parse_args()
+
+    results = Queue()
+    print '{:<10}{:>10}{:>16}{:>14}{:>20}'.format('mode', 'games', 'retained KB', 'bytes/game', 'peak rss delta KB')
+    for mode in MODES:
+        # Each mode runs in a fresh process, so the growth in max RSS is its own.
+        p = Process(target=run_mode, args=(mode, args.users, args.wishlists, args.games, results))
+        p.start()
+        mode, games, retained, rss = results.get()
+        p.join()
+        print '{:<10}{:>10}{:>16}{:>14}{:>20}'.format(mode, games, retained // 1024, retained // games, rss)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import SteamWebClasses as swc
+import fixtures
+
+
+def extract(app, indexed):
+    app.index_store_dom = indexed
+    app.store_elements_dom = None
+    app.get_app_info_from_dom()
+    return app.app_info
+
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('pages', nargs='+')
+    parser.add_argument('-n', '--repeat', type=int, default=20)
+    parser.add_argument('-m', '--parse-mode', default='full', choices=('full', 'fast'))
+
+    args = parser.parse_args()
+
+    print '{:<40}{:>16}{:>16}{:>10}'.format('page', 'per-find ms', 'one-pass ms', 'speedup')
+    for path in args.pages:
+        text = fixtures.load_page(path)
+        app = swc.SteamAppInfo(app_id=0, domtype='basic', parse_mode=args.parse_mode)
+        app.parse_store_page(text)
+        if extract(app, False) != extract(app, True):
+            print 'WARNING: extractors disagree on {}'.format(path)
+
+        timings = []
+        for indexed in (False, True):
+            start = time.clock()
+            for _ in range(args.repeat):
+                extract(app, indexed)
+            timings.append((time.clock() - start) * 1000 / args.repeat)
+        print '{:<40}{:>16.2f}{:>16.2f}{:>9.1f}x'.format(os.path.basename(path)[-40:], timings[0], timings[1],
+                                                         timings[0] / timings[1])
+
+
+if __name__ == '__main__':
+    main()
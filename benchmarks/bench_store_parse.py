@@ -0,0 +1,63 @@
+import argparse
+import os
+import resource
+import sys
+import time
+from multiprocessing import Process, Queue
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import SteamWebClasses as swc
+import fixtures
+
+PARSE_MODES = ('full', 'fast')
+
+
+def parse_page(text, mode):
+    app = swc.SteamAppInfo(app_id=0, domtype='basic', parse_mode=mode)
+    app.parse_store_page(text)
+    app.get_app_info_from_dom()
+    return app.app_info
+
+
+def run_mode(paths, mode, repeat, results):
+    texts = [fixtures.load_page(path) for path in paths]
+
+    # Each mode runs in a fresh process, so the growth in max RSS is the parser's own peak.
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.clock()
+    for _ in range(repeat):
+        for text in texts:
+            parse_page(text, mode)
+    cpu = time.clock() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    results.put((mode, cpu / (repeat * len(texts)), rss_after - rss_before))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('pages', nargs='+')
+    parser.add_argument('-n', '--repeat', type=int, default=5)
+    parser.add_argument('-m', '--modes', nargs='+', default=PARSE_MODES, choices=PARSE_MODES)
+
+    args = parser.parse_args()
+
+    for path in args.pages:
+        text = fixtures.load_page(path)
+        app_infos = [parse_page(text, mode) for mode in args.modes]
+        if any(app_info != app_infos[0] for app_info in app_infos):
+            print 'WARNING: parse modes disagree on {}'.format(path)
+
+    results = Queue()
+    print '{:<8}{:>16}{:>20}'.format('mode', 'cpu ms/page', 'peak rss delta KB')
+    for mode in args.modes:
+        p = Process(target=run_mode, args=(args.pages, mode, args.repeat, results))
+        p.start()
+        mode, cpu, rss = results.get()
+        p.join()
+        print '{:<8}{:>16.2f}{:>20}'.format(mode, cpu * 1000, rss)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Synthetic pages are built with the same structure the scrapers read from the live sites, padded with unrelated
+# markup to a realistic size.  A page recorded with record_fixtures.py under the same name takes precedence.
+
+
+def get_filler(rng, count):
+    rows = []
+    for i in range(count):
+        rows.append(u'<div class="home_area_spotlight f{0}"><a href="/x/{0}/" class="spotlight_link">'
+                    u'<img src="https://cdn.example/{0}.jpg" alt=""></a><span class="spotlight_text">{1}</span>'
+                    u'</div>'.format(i, u' '.join(rng.choice(WORDS) for _ in range(12))))
+    return u'\r\n'.join(rows)
+
+
+WORDS = [u'shadow', u'quest', u'legend', u'space', u'tactics', u'farm', u'dungeon', u'craft', u'racing', u'puzzle',
+         u'sim', u'city', u'dark', u'souls', u'pixel', u'survival', u'horror', u'island', u'empire', u'rogue']
+
+
+def get_title(rng):
+    return u' '.join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(1, 4)))
+
+
+def store_page(app_id=440, mature=False, filler=1500):
+    rng = random.Random(app_id)
+    title = get_title(rng) + u' é'
+    tags = u''.join(u'\r\n\t\t\t\t\t\t<a href="https://store.steampowered.com/tags/en/{0}/" class="app_tag">'
+                    u'\r\n\t\t\t\t\t\t\t{0}\t\t\t\t\t\t</a>'.format(rng.choice(WORDS).capitalize()) for _ in range(20))
+    mature_block = (u'<div class="game_area_mature_content"><p>Mature Content Description</p></div>'
+                    if mature else u'')
+    return u'''<!DOCTYPE html>\r\n<html><head><title>{title} on Steam</title>
+<script type="text/javascript">var g_AccountID = 0; var html = "<div class=\\"x\\">";</script></head><body>
+{filler}
+<div class="apphub_AppName">{title}</div>
+<div class="game_description_snippet">\r\n\t\t\t\tA {w1} game about {w2} and {w3}.\t\t\t</div>
+<div class="user_reviews_summary_row" data-store-tooltip="88% of the 312 user reviews in the last 30 days are positive.">
+<div class="subtitle column">Recent Reviews:</div><span class="game_review_summary positive">Very Positive</span></div>
+<div class="user_reviews_summary_row" data-store-tooltip="93% of the 45,120 user reviews for this game are positive.">
+<div class="subtitle column">All Reviews:</div><span class="game_review_summary positive">Very Positive</span></div>
+<div class="release_date"><div class="subtitle column">Release Date:</div><div class="date">\r\n\t10 Oct, 2007</div></div>
+<div class="glance_tags popular_tags" data-appid="{app_id}">{tags}\r\n<div class="app_tag add_button">+</div>\r\n</div>
+{mature_block}
+{filler}
+<div id="game_area_metascore"><div class="score high">\r\n\t\t\t\t\t\t\t\t\t\t92\t\t\t\t\t\t\t\t\t</div></div>
+<div id="category_block"><div class="game_area_details_specs"><a class="name" href="/c/1">Multi-player</a></div>
+<div class="game_area_details_specs"><a class="name" href="/c/22">Steam Achievements</a></div>
+<div class="game_area_details_specs"><a class="name" href="/c/29">Steam Trading Cards</a></div></div>
+<div class="block game_details underlined_links"><div class="block_content"><div class="block_content_inner">
+<div class="details_block">\r\n\t<b>Title:</b> {title}<br>\r\n\t<b>Genre:</b> <a href="/g/1">Action</a>, <a href="/g/2">Free to Play</a><br>
+\r\n\t<b>Developer:</b>\r\n\t<a href="/d">Valve</a><br>\r\n\t<b>Publisher:</b>\r\n\t<a href="/p">Valve</a><br>
+\r\n<b>Release Date:</b> 10 Oct, 2007<br>\r\n</div></div></div></div>
+<div class="details_block"><a href="/x">View update history</a></div>
+{filler}</body></html>'''.format(title=title, app_id=app_id, tags=tags, mature_block=mature_block,
+                                 filler=get_filler(rng, filler // 3), w1=rng.choice(WORDS), w2=rng.choice(WORDS),
+                                 w3=rng.choice(WORDS))
+
+
+def steamdb_page(app_id=440, filler=600):
+    rng = random.Random(app_id)
+    countries = [(u'us', u'U.S. Dollar', u'$19.99', u'$4.99 at -75%')] + [
+        (cc, u'Currency ' + cc, u'{}.99'.format(rng.randint(5, 40)), u'{}.49 at -50%'.format(rng.randint(1, 5)))
+        for cc in (u'eu', u'uk', u'ru', u'br', u'au', u'ca', u'jp', u'cn', u'kr', u'tr', u'ua', u'mx', u'in')]
+    rows = u''.join(u'<tr><td data-cc="{}">{}</td><td>{}</td><td data-sort="1">{}</td>'
+                    u'<td title="{} November 2019">{}</td></tr>'.format(cc, name, price, price, rng.randint(1, 28),
+                                                                        low) for cc, name, price, low in countries)
+    return u'''<!DOCTYPE html><html><head><title>SteamDB</title></head><body>{filler}
+<h1 itemprop="name">{title}</h1>
+<table class="table"><tr><td>Developer</td><td><span itemprop="author">Valve</span></td></tr>
+<tr><td>Publisher</td><td><span itemprop="publisher">Valve, Other Publisher</span></td></tr></table>
+<table class="table-prices">{rows}</table>
+{filler}</body></html>'''.format(filler=get_filler(rng, filler // 2), title=get_title(rng), rows=rows)
+
+
+def achievements_page(count=150, app_id=440):
+    rng = random.Random(app_id)
+    rows = []
+    for i in range(count):
+        rows.append(u'<div class="achieveRow"><div class="achieveImgHolder"><img src="/a/{0}.jpg"></div>'
+                    u'<div class="achieveTxtHolder"><div class="achievePercent">{1:.1f}%</div>'
+                    u'<div class="achieveTxt"><h3>{2}</h3><h5>{3}</h5></div></div></div>'.format(
+                        i, rng.uniform(0.1, 99.9), get_title(rng), u' '.join(rng.choice(WORDS) for _ in range(8))
+                        if i % 7 else u''))
+    return u'<html><body>{}<div id="mainContents">{}</div></body></html>'.format(get_filler(rng, 100),
+                                                                                 u'\n'.join(rows))
+
+
+def user_achievements_page(count=150, app_id=440):
+    rng = random.Random(app_id)
+    rows = []
+    for i in range(count):
+        unlock = (u'<div class="achieveUnlockTime">\r\n\t\t\tUnlocked 3 Mar, 2016 @ 9:{:02d}pm\t</div>'.format(i % 60)
+                  if i % 3 else u'')
+        rows.append(u'<div class="achieveRow"><div class="achieveTxtHolder"><div class="achieveTxt"><h3>{1}</h3>'
+                    u'<h5>{2}</h5>{0}</div></div></div>'.format(unlock, get_title(rng),
+                                                             u' '.join(rng.choice(WORDS) for _ in range(8))))
+    return u'<html><body>{}<div id="personalAchieve">{}</div></body></html>'.format(get_filler(rng, 100),
+                                                                                    u'\n'.join(rows))
+
+
+def wishlist_data(count, seed=0):
+    rng = random.Random(seed)
+    apps, appinfo = [], {}
+    for i in range(count):
+        app_id = 10000 + i * 10
+        apps.append({'appid': app_id, 'priority': i + 1, 'added': 1500000000 + rng.randint(0, 10 ** 8)})
+        if i % 97 == 13:
+            # Apps that were removed from the store are listed without app info.
+            continue
+        full = rng.choice([499, 999, 1499, 1999, 2999, 3999, 5999])
+        pct = rng.choice([0, 0, 0, 10, 25, 33, 50, 66, 75, 90])
+        final = full * (100 - pct) // 100
+        sub = {'id': app_id + 1, 'discount_pct': pct, 'price': final,
+               'discount_block': u'<div class="discount_block game_purchase_discount" data-price-final="{0}">'
+                                 u'<div class="discount_pct">-{1}%</div><div class="discount_prices">'
+                                 u'<div class="discount_original_price">${2:.2f}</div>'
+                                 u'<div class="discount_final_price">${3:.2f}</div></div></div>'.format(
+                                     final, pct, full / 100.0, final / 100.0)}
+        appinfo[str(app_id)] = {'name': get_title(rng), 'capsule': u'https://cdn.example/{}.jpg'.format(app_id),
+                                'review_score': rng.randint(1, 9), 'review_desc': u'Mostly Positive',
+                                'reviews_total': u'{:,}'.format(rng.randint(10, 100000)),
+                                'release_date': 1400000000 + rng.randint(0, 10 ** 8),
+                                'subs': [sub] if i % 41 != 7 else [], 'type': u'Game',
+                                'tags': [rng.choice(WORDS) for _ in range(5)]}
+    return apps, appinfo
+
+
+def wishlist_page(count=500, seed=0):
+    apps, appinfo = wishlist_data(count, seed)
+    rng = random.Random(seed)
+    return u'''<!DOCTYPE html><html><head><title>Wishlist</title></head><body>{filler}
+<script type="text/javascript">
+\t\tvar g_strWishlistBaseURL = "https://store.steampowered.com/wishlist/profiles/76561197960287930/";
+\t\tvar g_rgWishlistData = {apps};
+\t\tvar g_rgAppInfo = {appinfo};
+\t\tvar g_nWishlistCount = {count};
+</script>
+{filler}</body></html>'''.format(filler=get_filler(rng, 300), apps=json.dumps(apps), appinfo=json.dumps(appinfo),
+                                 count=count)
+
+
+def tag_browse_page(rows=15, tag=u'Indie'):
+    rng = random.Random(tag)
+
+    def row(app_id, discounted):
+        if discounted:
+            price = (u'<div class="discount_block tab_item_discount"><div class="discount_pct">-50%</div>'
+                     u'<div class="discount_prices"><div class="discount_original_price">$19.99</div>'
+                     u'<div class="discount_final_price">$9.99</div></div></div>')
+        else:
+            price = (u'<div class="discount_block tab_item_discount no_discount"><div class="discount_prices">'
+                     u'<div class="discount_final_price">$14.99</div></div></div>')
+        return (u'<a href="https://store.steampowered.com/app/{0}/Some_Game/?snr=1_241_4" class="tab_item">'
+                u'<div class="tab_item_cap"><img src="/c/{0}.jpg"></div>{1}<div class="tab_item_content">'
+                u'<div class="tab_item_name">{2}</div><div class="tab_item_details"><span class="top_tag">{3}</span>'
+                u'</div></div></a>'.format(app_id, price, get_title(rng), tag))
+
+    tabs = []
+    for i, tab in enumerate((u'NewReleasesRows', u'TopSellersRows', u'ConcurrentUsersRows', u'ComingSoonRows')):
+        tabs.append(u'<div id="{}" class="tab_content">{}</div>'.format(
+            tab, u'\n'.join(row(20000 + i * 100 + j, j % 3 == 0) for j in range(rows))))
+    return u'<html><body>{0}<div class="contenthub_tabs">{1}</div>{0}</body></html>'.format(get_filler(rng, 400),
+                                                                                           u'\n'.join(tabs))
+
+
+GENERATORS = {'store_app.html': store_page,
+              'store_agecheck_app.html': lambda: store_page(292030, mature=True),
+              'steamdb_app.html': steamdb_page,
+              'achievements.html': achievements_page,
+              'user_achievements.html': user_achievements_page,
+              'wishlist_10.html': lambda: wishlist_page(10),
+              'wishlist_500.html': lambda: wishlist_page(500),
+              'wishlist_5000.html': lambda: wishlist_page(5000),
+              'tag_browse.html': tag_browse_page}
+
+
+def get_fixture_path(name):
+    return os.path.join(FIXTURE_DIR, name)
+
+
+def has_fixture(name):
+    # Recorded-only fixtures, like a live wishlist, have no generator to fall back on.
+    return name in GENERATORS or os.path.exists(get_fixture_path(name))
+
+
+def load_page(path):
+    # Read as bytes and decoded as UTF-8, the same as a response body.  Text mode on Windows would turn \r\n into \n
+    # and drop the \r that get_tags() splits the tags on.
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8')
+
+
+def load_fixture(name):
+    # Returns the page as UTF-8 bytes, the same as a response body.
+    path = get_fixture_path(name)
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    return GENERATORS[name]().encode('utf-8')
+
+
+def write_fixtures(names=None):
+    if not os.path.isdir(FIXTURE_DIR):
+        os.makedirs(FIXTURE_DIR)
+    for name in names or sorted(GENERATORS):
+        with io.open(get_fixture_path(name), 'w', encoding='utf-8') as f:
+            f.write(GENERATORS[name]())
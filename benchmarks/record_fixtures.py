@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import SteamWebClasses as swc
+import fixtures
+
+
+def save_fixture(name, content):
+    if not os.path.isdir(fixtures.FIXTURE_DIR):
+        os.makedirs(fixtures.FIXTURE_DIR)
+    with open(fixtures.get_fixture_path(name), 'wb') as f:
+        f.write(content)
+    print 'Recorded {} ({} bytes)'.format(name, len(content))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('--app-id', default='440')
+    parser.add_argument('--agecheck-app-id', default='292030')
+    parser.add_argument('--user-id')
+    parser.add_argument('--tag', default='Indie')
+    parser.add_argument('--generate', action='store_true')
+
+    args = parser.parse_args()
+
+    if args.generate:
+        fixtures.write_fixtures()
+        return
+
+    client = swc.get_client()
+    save_fixture('store_app.html',
+                 client.get('{}/app/{}/'.format(swc.STEAM_STORE_URL, args.app_id)).content)
+    form_data = {'snr': '1_agecheck_agecheck__age-gate', 'ageDay': '1', 'ageMonth': 'April', 'ageYear': '1980'}
+    save_fixture('store_agecheck_app.html',
+                 client.post('{}/agecheck/app/{}/'.format(swc.STEAM_STORE_URL, args.agecheck_app_id),
+                             data=form_data).content)
+    save_fixture('steamdb_app.html',
+                 client.get('{}/app/{}/info/'.format(swc.STEAMDB_URL, args.app_id)).content)
+    save_fixture('achievements.html',
+                 client.get('{}/stats/{}/achievements/'.format(swc.STEAM_COMMUNITY_URL, args.app_id)).content)
+    save_fixture('tag_browse.html',
+                 client.get('{}/tags/en/{}/'.format(swc.STEAM_STORE_URL, args.tag)).content)
+    if args.user_id:
+        save_fixture('user_achievements.html',
+                     client.get('{}/profiles/{}/stats/{}/achievements/'.format(swc.STEAM_COMMUNITY_URL, args.user_id,
+                                                                               args.app_id)).content)
+        wishlist = swc.SteamWishList(args.user_id, initialize=False)
+        wishlist.get_wishlist_dom()
+        save_fixture('wishlist_recorded.html', wishlist.page)
+
+
+if __name__ == '__main__':
+    main()
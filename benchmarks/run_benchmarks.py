@@ -0,0 +1,145 @@
+import argparse
+import gc
+import json
+import os
+import resource
+import sys
+import time
+from multiprocessing import Process, Queue
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import SteamWebClasses as swc
+import fixtures
+
+
+def parse_store(page, parse_mode='full'):
+    app = swc.SteamAppInfo(app_id=0, domtype='basic', parse_mode=parse_mode)
+    app.parse_store_page(page.decode('utf-8'))
+    app.get_app_info_from_dom()
+    return app
+
+
+def parse_steamdb(page):
+    app = swc.SteamAppInfo(app_id=0, domtype='steamdb')
+    app.parse_steamdb_page(page.decode('utf-8'))
+    app.get_app_info_from_dom()
+    return app
+
+
+def parse_achievements(page):
+    achievements = swc.SteamAppGlobalAchievements(app_id=0)
+    achievements.parse_achievements_page(page.decode('utf-8'))
+    achievements.get_achievements_from_dom()
+    return achievements
+
+
+def parse_user_achievements(page):
+    achievements = swc.SteamAppUserAchievements(user_id=0, app_id=0)
+    achievements.parse_user_achievements_page(page.decode('utf-8'))
+    achievements.get_user_achievments_from_dom()
+    return achievements
+
+
+def parse_wishlist(page):
+    wishlist = swc.SteamWishList(user_id=0, initialize=False)
+    wishlist.page = page
+    wishlist.parse_dom()
+    return wishlist
+
+
+def parse_tag_browse(page):
+    browse = swc.SteamBrowseByTag('bench', initialize=False)
+    browse.parse_tag_browse_page(page.decode('utf-8'))
+    browse.parse_dom()
+    return browse
+
+
+SCENARIOS = [('store_app', 'store_app.html', parse_store),
+             ('store_app_fast', 'store_app.html', lambda page: parse_store(page, 'fast')),
+             ('store_agecheck_app', 'store_agecheck_app.html', parse_store),
+             ('steamdb_app', 'steamdb_app.html', parse_steamdb),
+             ('achievements', 'achievements.html', parse_achievements),
+             ('user_achievements', 'user_achievements.html', parse_user_achievements),
+             ('wishlist_10', 'wishlist_10.html', parse_wishlist),
+             ('wishlist_500', 'wishlist_500.html', parse_wishlist),
+             ('wishlist_5000', 'wishlist_5000.html', parse_wishlist),
+             ('wishlist_recorded', 'wishlist_recorded.html', parse_wishlist),
+             ('tag_browse', 'tag_browse.html', parse_tag_browse)]
+
+
+def run_scenario(fixture, parse, min_time, results):
+    page = fixtures.load_fixture(fixture)
+    gc.collect()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # gc-tracked objects still alive after one parse: what a caller keeps around per page.
+    objects_before = len(gc.get_objects())
+    result = parse(page)
+    objects = len(gc.get_objects()) - objects_before
+    del result
+
+    runs = 0
+    start = time.time()
+    cpu_start = time.clock()
+    while time.time() - start < min_time or runs < 3:
+        parse(page)
+        runs += 1
+    cpu = (time.clock() - cpu_start) / runs
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    results.put({'bytes': len(page), 'runs': runs, 'cpu_ms': cpu * 1000, 'pages_per_sec': 1 / cpu if cpu else 0,
+                 'mb_per_sec': len(page) / cpu / 2 ** 20 if cpu else 0, 'objects': objects,
+                 'peak_rss_kb': rss_after - rss_before})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('scenarios', nargs='*')
+    parser.add_argument('-t', '--min-time', type=float, default=1.0)
+    parser.add_argument('-o', '--output')
+    parser.add_argument('-c', '--compare')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+
+    args = parser.parse_args()
+
+    report = {}
+    print '{:<20}{:>10}{:>12}{:>10}{:>10}{:>12}{:>14}'.format('scenario', 'KB', 'cpu ms', 'pages/s', 'MB/s',
+                                                               'objects', 'peak rss KB')
+    for name, fixture, parse in SCENARIOS:
+        if args.scenarios and name not in args.scenarios:
+            continue
+        if not fixtures.has_fixture(fixture):
+            print '{:<20}{:>10}'.format(name, 'skipped, not recorded')
+            continue
+        # Each scenario runs in a fresh process, so its peak RSS isn't hidden by an earlier, larger one.
+        results = Queue()
+        p = Process(target=run_scenario, args=(fixture, parse, args.min_time, results))
+        p.start()
+        r = results.get()
+        p.join()
+        report[name] = r
+        print '{:<20}{:>10}{:>12.2f}{:>10.1f}{:>10.2f}{:>12}{:>14}'.format(name, r['bytes'] // 1024, r['cpu_ms'],
+                                                                            r['pages_per_sec'], r['mb_per_sec'],
+                                                                            r['objects'], r['peak_rss_kb'])
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = []
+        for name, r in sorted(report.items()):
+            if name in baseline and r['cpu_ms'] > baseline[name]['cpu_ms'] * (1 + args.tolerance):
+                regressions.append('{}: {:.2f} ms vs {:.2f} ms'.format(name, r['cpu_ms'], baseline[name]['cpu_ms']))
+        if regressions:
+            print 'Regressions beyond {:.0%}:'.format(args.tolerance)
+            for regression in regressions:
+                print '  ' + regression
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+import os
+import re
+import sys
+import threading
+import time
+import unittest
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import SteamWebClasses as swc
+import wishlist_analyzer
+from SteamWebClient import SteamWebClient
+
+HOST_LIMIT = 2
+GAMES = 30
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class SteamDBHandler(BaseHTTPRequestHandler):
+    # Even app ids are at their historical low of $5.00, odd ones have been $3.00.  Later apps answer sooner, so
+    # requests finish out of order whenever more than one is in flight.
+    def do_GET(self):
+        m = re.match(r'/app/(\d+)/info/', self.path)
+        if not m:
+            self.send_response(404)
+            self.end_headers()
+            return
+        server = self.server
+        with server.lock:
+            server.inflight += 1
+            server.max_inflight = max(server.max_inflight, server.inflight)
+        try:
+            app_id = int(m.group(1))
+            time.sleep(0.01 * (GAMES - app_id) / 3.0)
+            low = '$5.00' if app_id % 2 == 0 else '$3.00'
+            body = ('<html><body><table><tr><td data-cc="us">U.S. Dollar</td><td>$19.99</td>'
+                    '<td title="1 November 2019">{} at -75%</td></tr></table></body></html>'.format(low))
+        finally:
+            with server.lock:
+                server.inflight -= 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HistoricalLowsTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(('127.0.0.1', 0), SteamDBHandler)
+        self.server.lock = threading.Lock()
+        self.server.inflight = 0
+        self.server.max_inflight = 0
+        threading.Thread(target=self.server.serve_forever).start()
+
+        self.saved = (swc.STEAMDB_URL, swc.STEAM_STORE_URL, swc.SteamAppInfo.app_info_cache, swc.default_client)
+        swc.STEAMDB_URL = swc.STEAM_STORE_URL = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+        # Every check has to reach the server, not the shared cache.
+        swc.SteamAppInfo.app_info_cache = None
+        swc.set_default_client(SteamWebClient(host_concurrency=HOST_LIMIT, retries=0))
+        self.games = [{'id': str(i), 'discount_price': '$5.00'} for i in range(1, GAMES + 1)]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        swc.STEAMDB_URL, swc.STEAM_STORE_URL, swc.SteamAppInfo.app_info_cache, default_client = self.saved
+        swc.set_default_client(default_client)
+
+    def get_lows(self, workers):
+        # A generator, like the streamed wishlist, so the windowed path is what gets exercised.
+        return [g['id'] for g in wishlist_analyzer.iter_historical_lows((g for g in self.games), workers=workers)]
+
+    def test_output_is_in_input_order(self):
+        expected = [str(i) for i in range(2, GAMES + 1, 2)]
+        self.assertEqual(self.get_lows(1), expected)
+        self.assertEqual(self.get_lows(8), expected)
+
+    def test_host_limit_holds_with_more_workers(self):
+        self.get_lows(8)
+        self.assertLessEqual(self.server.max_inflight, HOST_LIMIT)
+        self.assertGreater(self.server.max_inflight, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,33 +1,230 @@
 import SteamWebClasses as swc
+import SteamWebCache
+from SteamDatabase import SteamCatalog, parse_price_cents
+from SteamPriceHistory import PriceHistory
+from SteamWebMetrics import get_metrics, StatsdSink
+from SteamWebClient import SteamWebClient
+from SteamWishlistWatcher import WishlistWatcher, TextSink, JsonLinesSink, WebhookSink
 import argparse
+import sys
+import time
+from collections import defaultdict
+from functools import partial
+from itertools import islice
+from multiprocessing.pool import ThreadPool
+
+
+def get_historical_low(app_id, catalog=None):
+    if catalog and not catalog.is_stale(app_id, 'historical_low'):
+        return catalog.get_historical_low(app_id)
+    # Only the SteamDB page is fetched, and only the price table is read from it.
+    hlp = swc.SteamAppInfo(app_id=app_id).historical_low_price
+    if catalog and hlp:
+        catalog.save_historical_low(app_id, hlp)
+    return hlp
+
+
+def is_historical_low(game, catalog=None):
+    hlp = get_historical_low(game['id'], catalog)
+    if not hlp:
+        return False
+    return float(hlp['price'].strip('$')) >= float(game['discount_price'].strip('$'))
+
+
+def get_historical_low_event(game, catalog=None):
+    # Watch mode enrichment: only sales at or below the historical low are reported.
+    hlp = get_historical_low(game['id'], catalog)
+    if not hlp or parse_price_cents(hlp['price']) < game['discount_price_cents']:
+        return None
+    return {'historical_low': hlp}
+
+
+def iter_historical_lows(games, workers=1, catalog=None):
+    check = partial(is_historical_low, catalog=catalog)
+    if workers <= 1:
+        for game in games:
+            if check(game):
+                yield game
+        return
+
+    pool = ThreadPool(workers)
+    games = iter(games)
+    try:
+        # Games are pulled from the input a window at a time, so a streamed wishlist is never fully buffered. imap
+        # hands results back in submission order, so output matches the sequential run.
+        while True:
+            window = list(islice(games, workers * 4))
+            if not window:
+                break
+            for game, at_low in zip(window, pool.imap(check, window)):
+                if at_low:
+                    yield game
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def get_wishlist(args, user_id):
+    return swc.SteamWishList(user_id=user_id, fetch_mode='data' if args.wishlist_data else 'page',
+                             workers=args.host_limit)
+
+
+def print_wishlist(parser, args, user_id, filters):
+    wishlist = get_wishlist(args, user_id)
+    catalog = SteamCatalog(args.db) if args.db else None
+    if catalog:
+        wishlist.save(catalog)
+    history = PriceHistory(args.history) if args.history else None
+    if history is not None:
+        history.record(wishlist)
+
+    if args.history_low:
+        if history is None:
+            parser.error('--history-low requires --history')
+        wlg = wishlist.get_discounted_games(sort_type=args.sort_type, **filters)
+        for game in history.get_games_at_all_time_low(wlg):
+            wishlist.print_game(game)
+    elif not args.historical_low:
+        wishlist.print_discounted_games(sort_type=args.sort_type, **filters)
+    else:
+        wlg = wishlist.get_discounted_games(sort_type=args.sort_type, **filters)
+        for game in iter_historical_lows(wlg, workers=args.workers, catalog=catalog):
+            wishlist.print_game(game)
+
+
+def print_wishlists(parser, args, filters):
+    catalog = SteamCatalog(args.db) if args.db else None
+    history = PriceHistory(args.history) if args.history else None
+    if args.history_low and history is None:
+        parser.error('--history-low requires --history')
+
+    pool = ThreadPool(min(len(args.user_id), args.host_limit))
+    try:
+        wishlists = pool.map(partial(get_wishlist, args), args.user_id)
+    finally:
+        pool.terminate()
+        pool.join()
+
+    user_games = []
+    for wishlist in wishlists:
+        if catalog:
+            wishlist.save(catalog)
+        if history is not None:
+            history.record(wishlist)
+        wlg = wishlist.get_discounted_games(sort_type=args.sort_type, **filters)
+        if args.history_low:
+            wlg = history.get_games_at_all_time_low(wlg)
+        user_games.append((wishlist, wlg))
+
+    if args.historical_low and not args.history_low:
+        # Each app is looked up once, however many of the wishlists it is on.
+        unique = {}
+        for _, wlg in user_games:
+            for game in wlg:
+                unique.setdefault(game['id'], game)
+        at_low = set(g['id'] for g in iter_historical_lows(unique.values(), workers=args.workers, catalog=catalog))
+        user_games = [(wishlist, [g for g in wlg if g['id'] in at_low]) for wishlist, wlg in user_games]
+
+    wishlisted_by = defaultdict(list)
+    for wishlist, wlg in user_games:
+        print '{}:'.format(wishlist.user_id)
+        for game in wlg:
+            wishlist.print_game(game)
+            wishlisted_by[game['id']].append(game)
+        print
+
+    print 'Most wishlisted on sale:'
+    ranked = sorted(wishlisted_by.values(), key=lambda games: (-len(games), games[0]['title']))
+    for games in ranked[:args.top]:
+        print '{} users:'.format(len(games)),
+        swc.SteamWishList.print_game(games[0])
+
+
+def watch_wishlist(parser, args, filters):
+    if len(args.user_id) > 1 or args.stream or args.sort_type:
+        parser.error('--watch takes a single user and cannot be combined with --stream or --sort-type')
+    catalog = SteamCatalog(args.db) if args.db else None
+    sinks = [JsonLinesSink() if args.events == 'jsonl' else TextSink()]
+    if args.webhook:
+        sinks.append(WebhookSink(args.webhook))
+    enrich = partial(get_historical_low_event, catalog=catalog) if args.historical_low else None
+    watcher = WishlistWatcher(args.user_id[0], filters=filters, enrich=enrich, sinks=sinks,
+                              state_path=args.watch_state, fetch_mode='data' if args.wishlist_data else 'page',
+                              workers=max(args.workers, args.host_limit))
+    watcher.run(args.watch, args.polls)
 
 
 def main():
     parser = argparse.ArgumentParser()
 
-    parser.add_argument('user_id')
+    parser.add_argument('user_id', nargs='+')
     parser.add_argument('-s', '--sort-type')
     parser.add_argument('-p', '--max-price')
     parser.add_argument('-d', '--min-discount')
+    parser.add_argument('--min-price')
+    parser.add_argument('--added-since')
+    parser.add_argument('--currency')
     parser.add_argument('-l', '--historical-low', action='store_true')
+    parser.add_argument('-w', '--workers', type=int, default=1)
+    parser.add_argument('--host-limit', type=int, default=4)
+    parser.add_argument('--rate-limit', type=float)
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('-c', '--cache-dir')
+    parser.add_argument('--db')
+    parser.add_argument('--history')
+    parser.add_argument('--history-low', action='store_true')
+    parser.add_argument('--wishlist-data', action='store_true')
+    parser.add_argument('--stream', action='store_true')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--watch', type=float)
+    parser.add_argument('--polls', type=int)
+    parser.add_argument('--watch-state')
+    parser.add_argument('--events', choices=('text', 'jsonl'), default='text')
+    parser.add_argument('--webhook')
+    parser.add_argument('--profile', action='store_true')
+    parser.add_argument('--statsd')
+    parser.add_argument('--prometheus-file')
 
     args = parser.parse_args()
 
-    wishlist = swc.SteamWishList(user_id=args.user_id)
+    if args.statsd:
+        host, _, port = args.statsd.partition(':')
+        get_metrics().add_sink(StatsdSink(host, int(port or 8125)))
 
-    max_price = int(args.max_price) if args.max_price else None
-    min_discount = int(args.min_discount) if args.min_discount else None
+    cache = SteamWebCache.ResponseCache(args.cache_dir) if args.cache_dir else None
+    swc.set_default_client(SteamWebClient(host_concurrency=args.host_limit, rate=args.rate_limit,
+                                          retries=args.retries, cache=cache))
+    filters = {'max_price': int(args.max_price) if args.max_price else None,
+               'min_discount': int(args.min_discount) if args.min_discount else None,
+               'min_price': int(args.min_price) if args.min_price else None,
+               'added_since': time.mktime(time.strptime(args.added_since, '%Y-%m-%d')) if args.added_since else None,
+               # Game currencies are unicode, and on Python 2 the argument is bytes.
+               'currency': args.currency.decode(sys.stdin.encoding or 'utf-8') if args.currency else None}
 
-    if not args.historical_low:
-        wishlist.print_discounted_games(sort_type=args.sort_type, max_price=max_price, min_discount=min_discount)
-    else:
-        wlg = wishlist.get_discounted_games(sort_type=args.sort_type, max_price=max_price, min_discount=min_discount)
+    if args.watch:
+        watch_wishlist(parser, args, filters)
+    elif args.stream:
+        if args.sort_type or args.db or args.history or len(args.user_id) > 1:
+            parser.error('--stream cannot be combined with --sort-type, --db, --history or more than one user')
+        # fetch -> parse -> filter -> optional historical low check -> print, one wishlistdata page at a time.
+        wishlist = swc.SteamWishList(user_id=args.user_id[0], initialize=False, fetch_mode='data',
+                                     workers=args.host_limit)
+        wlg = wishlist.iter_discounted_games(wishlist.iter_wishlist_games(), **filters)
+        if args.historical_low:
+            wlg = iter_historical_lows(wlg, workers=args.workers)
         for game in wlg:
-            sdb = swc.SteamAppInfo(app_id=game['id'], domtype='steamdb')
-            sdb.initialize()
-            hlp = sdb.get_steamdb_historical_low_price()
-            if float(hlp['price'].strip('$')) >= float(game['discount_price'].strip('$')):
-                wishlist.print_game(game)
+            wishlist.print_game(game)
+    elif len(args.user_id) > 1:
+        print_wishlists(parser, args, filters)
+    else:
+        print_wishlist(parser, args, args.user_id[0], filters)
+
+    if args.profile:
+        print
+        print get_metrics().format_report()
+    if args.prometheus_file:
+        with open(args.prometheus_file, 'w') as f:
+            f.write(get_metrics().format_prometheus())
 
 
 if __name__ == '__main__':